@@ -15,7 +15,7 @@ from agent.shared.state import AgentState
 from operators import OPERATOR_REGISTRY
 
 # Select operators from operator pool
-from operators.coding.sql_generator import generate_sql_queries  # Select from operator pool: SQL generation operator
+from operators.coding.sql_generator import build_sql_template, generate_sql_queries  # Select from operator pool: SQL generation operator
 from operators.coding.perception_code_generator import generate_perception_instruction  # Select from operator pool: perception code generation operator
 
 
@@ -62,9 +62,25 @@ class CodingAgent:
         instruction = generate_perception_instruction(state)
         print(f"Generated execution instruction - operator: {instruction['operator']}")
         print(f"Generated execution instruction - params: {instruction['params']}")
-        new_state = state.copy()
-        new_state["perception_instruction"] = instruction  # Store generated instruction in state
-        return new_state
+        # Return only the updated channel (partial update), LangGraph merges it into the shared state;
+        # this keeps the parallel fan-out branches writing to distinct state channels
+        return {"perception_instruction": instruction}
+
+    def generate_sql_template(self, state: AgentState) -> AgentState:
+        """
+        Call coding operator: Generate the object-independent SQL query template
+
+        Select from operator pool: operators.coding.sql_generator.build_sql_template
+
+        This step does not depend on perception results, so it runs in parallel with
+        perception code generation (Send fan-out), saving one sequential step on the reasoning path.
+        """
+        print("\n================================[SqlCodingAgent]=================================\n")
+        print("SqlCodingAgent called SQL template generation function:")
+        template = build_sql_template()
+        print("Generated SQL query template (labels filled in after perception)")
+        # Write to the dedicated sql_template channel, distinct from the perception branch
+        return {"sql_template": template}
 
     def generate_sql(self, state: AgentState) -> AgentState:
         """
@@ -76,13 +92,11 @@ class CodingAgent:
         """
         print("\n================================[SqlCodingAgent]=================================\n")
         print("SqlCodingAgent called SQL generation function:")
-        # Call coding operator from operator pool
-        sqls = generate_sql_queries(state["objects"] or [])
-        sql_statements = (state["sql_statements"] or []) + sqls
-        print(f"Generated {len(sql_statements)} SQL queries based on detected entities:")
-        for i, sql in enumerate(sql_statements, 1):
-            print(f"[{i}] {sql}")
-        new_state = state.copy()  # Create new state, add SQL statements, output state
-        new_state["sql_statements"] = sql_statements
-        return new_state
+        # Call coding operator from operator pool, filling the template produced by the parallel branch
+        sqls = generate_sql_queries(state["objects"] or [], state.get("sql_template") or None)
+        print(f"Generated {len(sqls)} SQL queries based on detected entities:")
+        for i, (sql, params) in enumerate(sqls, 1):
+            print(f"[{i}] {sql} | params: {params}")
+        # Return only the new SQLs; the operator.add reducer on sql_statements appends them
+        return {"sql_statements": sqls}
 
@@ -74,9 +74,11 @@ class CoordinationAgent:
     def retry(self, state: AgentState) -> AgentState:
         """
         Retry: Invoke intelligent retry, ensuring the system can autonomously explore, fail, and adapt.
-        
+
         Future implementation: Select retry operator from operator pool
         """
         # TODO: Implement retry logic
+        # Transient LLM API failures are already retried with backoff inside the wrappers and
+        # surface as llm.errors.LLMError; graph-level retry/rollback can catch that type here
         # Select from operator pool: operators.coordination.retry_handler.retry_operator
         return state
@@ -10,11 +10,12 @@ Responsibilities:
 3. Compose operators into an execution plan (LangGraph DAG)
 4. Serve as the entry point of the entire system
 """
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+import asyncio
+import types
+from functools import cached_property
 
 from langgraph.graph import StateGraph
+from langgraph.types import Send
 
 from agent.codingAgent.CodingAgent import CodingAgent
 from agent.coordinationAgent.CoordinationAgent import CoordinationAgent
@@ -43,21 +44,20 @@ class DecompositionAgent:
     - Select operators from operator pool and compose execution plan
     
     New execution flow (interface separation):
-    - Reasoning path: intent classification -> generate perception code -> execute perception -> generate SQL -> execute SQL
+    - Reasoning path: intent classification -> (generate perception code || generate SQL template) -> execute perception -> generate SQL -> execute SQL
     
     Architecture design:
-    - Instantiate two Coding Agent objects: one for generating Python/YOLO call code, one for generating SQL
-    - Instantiate two Execution Agent objects: one for executing perception (YOLO), one for executing SQL, routing, filtering, chat
-    - This design facilitates future parallel processing
+    - One Coding Agent instance serves both coding flows (Python/YOLO call code and SQL)
+    - One Execution Agent instance serves both execution flows (perception, SQL, routing, filtering, chat)
+    - Agents are stateless per call and the heavy resources (YOLO weights, DuckDB connection)
+      are process-level singletons in their operator modules, so parallel branches can share
+      one instance of each without duplicating anything
     """
     def __init__(self):
-        # Instantiate Coding Agents (two objects for future parallel processing)
-        self.perception_coding_agent = CodingAgent()  # For generating Python/YOLO call code
-        self.sql_coding_agent = CodingAgent()          # For generating SQL query code
-        
-        # Instantiate Execution Agents (two objects for future parallel processing)
-        self.perception_execution_agent = ExecutionAgent()  # For executing perception (YOLO)
-        self.sql_execution_agent = ExecutionAgent()          # For executing SQL, routing, filtering, chat
+        # Instantiate one Coding Agent and one Execution Agent; both are stateless per call,
+        # so the parallel perception/SQL branches share them instead of duplicating object graphs
+        self.coding_agent = CodingAgent()      # Generates Python/YOLO call code and SQL
+        self.execution_agent = ExecutionAgent()  # Executes perception, SQL, routing, filtering, chat
         
         # Instantiate Coordination Agent
         self.coordination_agent = CoordinationAgent()  # Select from operator pool: coordination operators (feedback, error handling, rollback, retry)
@@ -65,62 +65,90 @@ class DecompositionAgent:
         # Operator registry (UOP - Unified Operator Pool)
         self.operator_registry = OPERATOR_REGISTRY
 
-    def classify_intent(self, state: AgentState) -> AgentState:
+        # Compile the execution plan once: StateGraph validation and Pregel plan construction
+        # are pure overhead on the request hot path, the compiled DAG is reusable across runs
+        self._compiled_graph = self.build_graph()
+
+    async def classify_intent(self, state: AgentState) -> AgentState:
         """
-        Core responsibility of Decomposition Agent: Classify user intent
-        
+        Core responsibility of Decomposition Agent: Classify user intent (async, non-blocking)
+
         Select from operator pool: operators.coordination.intent_classifier.classify_intent_operator
         This is the first step of task decomposition, determining the direction of the entire execution flow.
         """
         print("\n================================[DecompositionAgent]=================================\n")
         print("DecompositionAgent called intent classification function:")
-        result_state = classify_intent_operator(state)
+        result_state = await classify_intent_operator(state)
         intent = result_state.get("intent", "unknown")
         print(f"Intent classification result: {intent}")
         return result_state
 
-    def route_intent(self, state: AgentState) -> str:
+    def route_intent(self, state: AgentState):
         """
         Core responsibility of Decomposition Agent: Determine execution flow direction based on intent
-        
+
         Select from operator pool: operators.coordination.intent_classifier.route_intent_condition
         Based on intent classification result, decide whether to take chat path or reasoning path.
+
+        The reasoning path fans out via Send: perception code generation and SQL template generation
+        are independent, so both are dispatched in the same superstep and run in parallel.
         """
         route = route_intent_condition(state)
         print(f"DecompositionAgent called intent routing function, routing to: {route} path")
-        return route
+        if route == "reasoning":
+            # Fan-out: dispatch both independent coding branches in parallel (joined at merge_perception_sql)
+            return [
+                Send("generate_perception_code", state),
+                Send("generate_sql_template", state),
+            ]
+        return "llm_chat"
+
+    def merge_perception_sql(self, state: AgentState) -> AgentState:
+        """
+        Join node of the parallel fan-out: waits for both the perception code branch and the
+        SQL template branch to finish (reducer semantics merge their writes), then the flow
+        continues with execute_perception -> generate_sql -> sql_router.
+        """
+        return {}
 
-    def _select_operators(self):
+    @cached_property
+    def _selected_operators(self):
         """
         Select operators from operator pool to build the operator combination required for execution plan.
-        
+
         According to the paper, this is the core function of the decomposition agent: selecting operators from the unified operator pool (UOP).
         Current implementation is hardcoded selection, can be extended to dynamic selection in the future.
+
+        Computed once per agent and frozen in a MappingProxyType: the selection is static, so
+        there is no reason to rebuild the dict of bound methods on every graph build.
         """
         # Select operators from operator pool (hardcoded approach, meets current requirements)
         selected_operators = {
             # Decomposition operators: intent classification (called directly by Decomposition Agent)
             "intent_classifier": self.classify_intent,
             "intent_router": self.route_intent,
-            # Execution operators: chat response (called through SQL Execution Agent)
-            "chat_responder": self.sql_execution_agent.chat,
-            # Coding operators: generate perception code (called through Perception Coding Agent)
-            "generate_perception_code": self.perception_coding_agent.generate_perception_code,
-            # Execution operators: execute perception (called through Perception Execution Agent, executes instructions generated by Coding Agent)
-            "execute_perception": self.perception_execution_agent.execute_perception,
-            # Coding operators: SQL generation (called through SQL Coding Agent)
-            "sql_generator": self.sql_coding_agent.generate_sql,
-            # Execution operators: SQL routing (called through SQL Execution Agent)
-            "sql_router": self.sql_execution_agent.sql_router_step,
-            "sql_router_condition": self.sql_execution_agent.route_sql,
-            # Execution operators: SQL execution (called through SQL Execution Agent)
-            "sql_executor": self.sql_execution_agent.execute_sql,
-            # Execution operators: result filtering (called through SQL Execution Agent)
-            "result_filter": self.sql_execution_agent.filter_result,
+            # Execution operators: chat response (called through Execution Agent)
+            "chat_responder": self.execution_agent.chat,
+            # Coding operators: generate perception code (called through Coding Agent)
+            "generate_perception_code": self.coding_agent.generate_perception_code,
+            # Coding operators: SQL template generation (called through Coding Agent, parallel with perception code generation)
+            "generate_sql_template": self.coding_agent.generate_sql_template,
+            # Decomposition operators: join node of the parallel fan-out
+            "merge_perception_sql": self.merge_perception_sql,
+            # Execution operators: execute perception (called through Execution Agent, executes instructions generated by Coding Agent)
+            "execute_perception": self.execution_agent.execute_perception,
+            # Coding operators: SQL generation (called through Coding Agent)
+            "sql_generator": self.coding_agent.generate_sql,
+            # Execution operators: batch SQL execution (called through Execution Agent);
+            # the generated queries are independent, so one batch node on parallel DuckDB
+            # cursors replaces the former route -> execute -> route loop
+            "sql_batch_executor": self.execution_agent.execute_sql_batch,
+            # Execution operators: result filtering (called through Execution Agent)
+            "result_filter": self.execution_agent.filter_result,
             # Coordination operators: result summarization (standalone operator, not tied to specific agent)
             "result_summarizer": summarize_result_operator,
         }
-        return selected_operators
+        return types.MappingProxyType(selected_operators)
 
     def build_graph(self):
         """
@@ -131,10 +159,10 @@ class DecompositionAgent:
         - Compose operators into a data flow graph (DAG)
         
         New execution flow (interface separation):
-        - Reasoning path: intent classification -> generate perception code -> execute perception -> generate SQL -> execute SQL
+        - Reasoning path: intent classification -> (generate perception code || generate SQL template) -> execute perception -> generate SQL -> execute SQL
         """
-        # Select operators from operator pool
-        operators = self._select_operators()
+        # Select operators from operator pool (frozen mapping, computed once)
+        operators = self._selected_operators
         
         # Build state graph
         graph = StateGraph(AgentState)
@@ -143,25 +171,28 @@ class DecompositionAgent:
         # Intent classification operator (called directly by Decomposition Agent)
         graph.add_node("classify_intent", operators["intent_classifier"])
 
-        # Chat operator (called through SQL Execution Agent)
+        # Chat operator (called through Execution Agent)
         graph.add_node("llm_chat", operators["chat_responder"])
 
-        # Generate perception code operator (called through Perception Coding Agent)
+        # Generate perception code operator (called through Coding Agent)
         graph.add_node("generate_perception_code", operators["generate_perception_code"])
 
-        # Execute perception operator (called through Perception Execution Agent, executes instructions generated by Coding Agent)
+        # SQL template generation operator (called through SQL Coding Agent, runs in parallel with perception code generation)
+        graph.add_node("generate_sql_template", operators["generate_sql_template"])
+
+        # Join node of the parallel fan-out (waits for both coding branches)
+        graph.add_node("merge_perception_sql", operators["merge_perception_sql"])
+
+        # Execute perception operator (called through Execution Agent, executes instructions generated by Coding Agent)
         graph.add_node("execute_perception", operators["execute_perception"])
 
-        # SQL generation operator (called through SQL Coding Agent)
+        # SQL generation operator (called through Coding Agent)
         graph.add_node("generate_sql", operators["sql_generator"])
 
-        # SQL routing operator (called through SQL Execution Agent)
-        graph.add_node("sql_router", operators["sql_router"])
+        # Batch SQL execution operator (called through Execution Agent)
+        graph.add_node("execute_sql_batch", operators["sql_batch_executor"])
 
-        # SQL execution operator (called through SQL Execution Agent)
-        graph.add_node("execute_sql", operators["sql_executor"])
-
-        # Result filtering operator (called through SQL Execution Agent)
+        # Result filtering operator (called through Execution Agent)
         graph.add_node("filter_result", operators["result_filter"])
 
         # Result summarization operator (standalone, converts structured results to natural language)
@@ -171,22 +202,17 @@ class DecompositionAgent:
         graph.set_entry_point("classify_intent")
 
         # Intent routing: select path based on intent classification result (core responsibility of Decomposition Agent)
-        graph.add_conditional_edges("classify_intent", operators["intent_router"], {
-            "chat": "llm_chat",
-            "reasoning": "generate_perception_code",  # Reasoning path: first generate perception code
-        })
-
-        # Reasoning path: generate perception code -> execute perception -> generate SQL -> route -> execute (loop) -> filter
-        graph.add_edge("generate_perception_code", "execute_perception")  # Perception Coding Agent generates code, Perception Execution Agent executes
-        graph.add_edge("execute_perception", "generate_sql")  # After executing perception, generate SQL
-        graph.add_edge("generate_sql", "sql_router")
-        graph.add_edge("execute_sql", "sql_router")
-        
-        # SQL execution loop: routing determines whether to continue execution
-        graph.add_conditional_edges("sql_router", operators["sql_router_condition"], {
-            "continue": "execute_sql",
-            "done": "filter_result"
-        })
+        # Chat path returns a node name; reasoning path returns Send objects that fan out
+        # perception code generation and SQL template generation in parallel
+        graph.add_conditional_edges("classify_intent", operators["intent_router"])
+
+        # Reasoning path: (generate perception code || generate SQL template) -> merge -> execute perception -> generate SQL -> batch execute -> filter
+        graph.add_edge("generate_perception_code", "merge_perception_sql")  # Perception Coding Agent generates code
+        graph.add_edge("generate_sql_template", "merge_perception_sql")  # SQL Coding Agent generates template (parallel branch)
+        graph.add_edge("merge_perception_sql", "execute_perception")  # Join, then Perception Execution Agent executes
+        graph.add_edge("execute_perception", "generate_sql")  # After executing perception, fill SQL template with detected labels
+        graph.add_edge("generate_sql", "execute_sql_batch")  # All queries run concurrently in one batch node
+        graph.add_edge("execute_sql_batch", "filter_result")
 
         # After filtering results, generate natural language summary
         graph.add_edge("filter_result", "summarize_result")
@@ -212,11 +238,9 @@ class DecompositionAgent:
         if state.get("image_path"):
             print(f"Image path: {state.get('image_path')}")
 
-        # Select operators from operator pool, build execution plan
-        graph = self.build_graph()
-        
-        # Execute plan
-        final_state = graph.invoke(state, {"recursion_limit": 100})
+        # Execute plan (compiled once in __init__, reused across invocations)
+        # ainvoke lets async LLM nodes overlap their network I/O instead of blocking the loop
+        final_state = asyncio.run(self._compiled_graph.ainvoke(state, {"recursion_limit": 100}))
         return final_state
 
 
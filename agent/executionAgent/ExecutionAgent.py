@@ -15,8 +15,8 @@ from agent.shared.state import AgentState, ExecutionInstruction
 from operators import OPERATOR_REGISTRY
 
 # Select operators from operator pool
-from operators.perception.yolo_detector import detect_objects  # Select from operator pool: perception operator
-from operators.execution.sql_executor import execute_sql_query  # Select from operator pool: execution operator
+from operators.perception.yolo_detector import detect_objects, detect_objects_batch  # Select from operator pool: perception operators
+from operators.execution.sql_executor import execute_sql_query, execute_sql_batch  # Select from operator pool: execution operators
 from operators.coordination.sql_router import sql_router_step, route_sql_condition  # Select from operator pool: SQL routing operator
 from operators.coordination.result_filter import filter_result_operator  # Select from operator pool: result filtering operator
 from operators.coordination.chat_responder import chat_responder_operator  # Select from operator pool: chat response operator
@@ -56,6 +56,7 @@ class ExecutionAgent:
         # Operator mapping table: maps operator names in instructions to actual operator functions
         self.operator_map = {
             "yolo_detector": detect_objects,
+            "yolo_detector_batch": detect_objects_batch,
             "sql_executor": execute_sql_query,
         }
 
@@ -83,14 +84,18 @@ class ExecutionAgent:
         # Call corresponding operator based on instruction
         operator_func = self.operator_map[operator_name]
         objects = operator_func(**params)  # Execute operator
-        
+        if objects and isinstance(objects[0], list):
+            # Batch operator returns one list per image; downstream reasoning works on a
+            # single flat object list
+            objects = [obj for per_image in objects for obj in per_image]
+
         print(f"Perception execution completed, detected {len(objects)} objects:")
         for i, obj in enumerate(objects, 1):
             print(f"[{i}] Label: {obj.get('label')} | Confidence: {obj.get('confidence'):.2f} | Location: {obj.get('bbox')}")
         
-        new_state = state.copy()
-        new_state["objects"] = objects  # Set new state with detected objects
-        return new_state  # Return new Agent state
+        # Return only the updated channel (partial update); with the sql_statements reducer in place,
+        # echoing the full state here would append duplicate entries
+        return {"objects": objects}
 
     def execute_sql(self, state: AgentState) -> AgentState:
         """
@@ -101,16 +106,17 @@ class ExecutionAgent:
         Interface separation: Execution Agent executes SQL generated by Coding Agent, does not generate SQL.
         """
         executed = set(state.get("executed_sqls") or [])  # Already executed SQLs
-        sql = state.get("current_sql")  # Currently executing SQL
+        current = state.get("current_sql")  # Currently executing SQL: (statement, params)
         index = str(state.get("current_index"))  # Index of currently executing SQL
-        if not sql:
+        if not current:
             print("No SQL to execute")
             return state
+        sql, params = current
         print("\n================================[SqlExecutionAgent]=================================\n")
         print(f"SqlExecutionAgent called SQL execution function:")
-        print(f"Executing SQL[{index}]: {sql}")
-        # Call execution operator from operator pool
-        result = execute_sql_query(sql)  # Single SQL statement execution result
+        print(f"Executing SQL[{index}]: {sql} | params: {params}")
+        # Call execution operator from operator pool (labels bound as prepared-statement parameters)
+        result = execute_sql_query(sql, params)  # Single SQL statement execution result
         if len(result) == 0:
             print(f"SQL execution result: [] (empty result)\n")
         else:  # If not empty, print execution result
@@ -119,12 +125,33 @@ class ExecutionAgent:
             for row in result:
                 print(f"\t{row}")
             print("]")
-        new_state = state.copy()  # Set new state, update executed statements and query results, return state
-        executed_sqls = list(executed | {sql})
-        new_state["executed_sqls"] = executed_sqls
+        # Return only the updated channels (partial update), LangGraph merges them into the shared state
+        executed_sqls = list(executed | {current})
         query_results = (state.get("query_results") or []) + [result]
-        new_state["query_results"] = query_results
-        return new_state
+        return {"executed_sqls": executed_sqls, "query_results": query_results}
+
+    def execute_sql_batch(self, state: AgentState) -> AgentState:
+        """
+        Call batch execution operator: Run all generated SQL queries concurrently
+
+        Select from operator pool: operators.execution.sql_executor.execute_sql_batch
+
+        The spatial queries are independent of each other, so one batch node replaces the
+        route -> execute -> route node loop and lets DuckDB run them on parallel cursors.
+        """
+        statements = state.get("sql_statements") or []
+        if not statements:
+            print("No SQL to execute")
+            return {}
+        print("\n================================[SqlExecutionAgent]=================================\n")
+        print(f"SqlExecutionAgent called batch SQL execution function:")
+        print(f"Executing {len(statements)} SQL queries concurrently")
+        # Call batch execution operator from operator pool (one result list per statement)
+        results = execute_sql_batch(statements)
+        for i, ((sql, params), result) in enumerate(zip(statements, results), 1):
+            print(f"SQL[{i}] params: {params} -> {len(result)} records")
+        # Return only the updated channels (partial update), LangGraph merges them into the shared state
+        return {"executed_sqls": list(statements), "query_results": results}
 
     def sql_router_step(self, state: AgentState) -> AgentState:
         """
@@ -150,11 +177,11 @@ class ExecutionAgent:
         """
         return filter_result_operator(state)
 
-    def chat(self, state: AgentState) -> AgentState:
+    async def chat(self, state: AgentState) -> AgentState:
         """
-        Call chat response operator: Use LLM to respond to user
-        
+        Call chat response operator: Use LLM to respond to user (async, non-blocking)
+
         Select from operator pool: operators.coordination.chat_responder.chat_responder_operator
         """
-        return chat_responder_operator(state)
+        return await chat_responder_operator(state)
 
@@ -1,6 +1,12 @@
-from typing import Any, Dict, List, Optional
+import operator
+from typing import Any, Dict, List, Optional, Tuple
 
-from typing_extensions import TypedDict
+from typing_extensions import Annotated, TypedDict
+
+# A generated SQL query: (statement text, bound parameters). Labels are bound as
+# prepared-statement parameters so only a handful of distinct statement texts exist
+# and DuckDB can reuse their parsed plans.
+SqlStatement = Tuple[str, Tuple[str, ...]]
 
 
 class ObjectBox(TypedDict):
@@ -35,10 +41,13 @@ class AgentState(TypedDict, total=False):
     objects: Optional[List[ObjectBox]]
 
     # Coding Agent (structured representation)
-    sql_statements: Optional[List[str]]
-    current_sql: Optional[str]
+    # sql_template is written by the SQL template branch of the parallel fan-out,
+    # sql_statements uses an operator.add reducer so concurrent branch writes are merged (appended) instead of conflicting
+    sql_template: Optional[str]
+    sql_statements: Annotated[List[SqlStatement], operator.add]
+    current_sql: Optional[SqlStatement]
     current_index: Optional[int]
-    executed_sqls: Optional[List[str]]
+    executed_sqls: Optional[List[SqlStatement]]
 
     # Execution Agent (database queries)
     query_results: Optional[List[str]]
@@ -58,8 +67,9 @@ def get_init_agent_state(user_text: str, image_path: str) -> AgentState:
         intent="",
         perception_instruction=None,
         objects=[],
+        sql_template="",
         sql_statements=[],
-        current_sql="",
+        current_sql=None,
         current_index=-1,
         executed_sqls=[],
         query_results=[],
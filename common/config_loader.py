@@ -1,18 +1,42 @@
+import pickle
+import threading
+
 import yaml
 from pathlib import Path
 
+try:  # C-accelerated loader when libyaml is available, pure-Python SafeLoader otherwise
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 _config_cache = None  # Cache configuration file
+_config_lock = threading.Lock()  # Parallel graph nodes must not double-parse the YAML
 
 def load_config():  # Load config.yaml from project root directory, cache in memory for global reuse, avoid repeated file reads
     global _config_cache
-    if _config_cache is None:  # If cache is empty, load configuration file
-        # Project root directory
-        project_root = Path(__file__).resolve().parents[1]
-        config_path = project_root / 'config.yaml'
-        if not config_path.exists():  # If configuration file does not exist, raise exception
-            raise FileNotFoundError(f"Configuration file not found: {config_path}")
-        with open(config_path, 'r', encoding="utf-8") as f:  # If exists, open configuration file and load into cache
-            _config_cache = yaml.safe_load(f)
+    if _config_cache is None:  # If cache is empty, load configuration file (double-checked under the lock)
+        with _config_lock:
+            if _config_cache is None:
+                # Project root directory
+                project_root = Path(__file__).resolve().parents[1]
+                config_path = project_root / 'config.yaml'
+                if not config_path.exists():  # If configuration file does not exist, raise exception
+                    raise FileNotFoundError(f"Configuration file not found: {config_path}")
+                # Pickle sidecar: unpickling is much faster than YAML parsing, reuse it while
+                # it is at least as new as the YAML source (mtime check)
+                pickle_path = project_root / 'config.yaml.pkl'
+                if pickle_path.exists() and pickle_path.stat().st_mtime >= config_path.stat().st_mtime:
+                    try:
+                        _config_cache = pickle.loads(pickle_path.read_bytes())
+                        return _config_cache
+                    except Exception:
+                        pass  # Corrupt/stale sidecar: fall through and re-parse the YAML
+                with open(config_path, 'r', encoding="utf-8") as f:  # If exists, open configuration file and load into cache
+                    _config_cache = yaml.load(f, Loader=_YamlLoader)
+                try:  # Refresh the sidecar for the next process start (best-effort)
+                    pickle_path.write_bytes(pickle.dumps(_config_cache))
+                except OSError:
+                    pass
     return _config_cache
 
 
@@ -1,48 +1,141 @@
 import os
+import types
 from typing import List
 
-import requests
+import httpx
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter
+
+from common.config_loader import load_config
+from llm import prompt_cache  # Two-tier (exact + semantic) cache in front of the API
+from llm.errors import LLMError
+
+# Shared retry policy: exponential backoff with jitter for transient API failures
+_RETRY_POLICY = dict(wait=wait_exponential_jitter(initial=0.2, max=4), stop=stop_after_attempt(3), reraise=True)
+
+# Resolved once at import: config file first, environment variable override, no per-instantiation
+# os.getenv / dict allocation on the node hot path
+_DEEPSEEK_CONFIG = (load_config().get("llm") or {}).get("deepseek") or {}
+_API_KEY = os.environ.get("DEEPSEEK_API_KEY") or _DEEPSEEK_CONFIG.get("api_key", "")
+_MODEL = _DEEPSEEK_CONFIG.get("model", "deepseek-chat")
+_BASE_URL = "https://api.deepseek.com/v1/chat/completions"
+_HEADERS = types.MappingProxyType({
+    "Authorization": f"Bearer {_API_KEY}",
+    "Content-Type": "application/json"
+})
 
 
 class DeepSeekWrapper:
+    # Process-wide HTTP clients (connection pooling + HTTP/2 multiplexing), created lazily
+    _client = None
+    _async_client = None
+
+    # Shared singleton instance (the wrapper is stateless per call, so one instance is enough)
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> "DeepSeekWrapper":
+        """Return the shared wrapper instance instead of reconstructing one per node call."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         """
         DeepSeek inference API wrapper, maintains the same external interface as QwenWrapper (chat(messages, temperature)).
-        It is recommended to configure authentication via environment variable DEEPSEEK_API_KEY.
-        """
-        # ⚠️ Temporarily hardcoded key for local quick testing. Change back to environment variable reading before deployment or code submission.
-        self.api_key = os.getenv("DEEPSEEK_API_KEY", "") or "sk-d942e96902514cc88890d51e1504ec34"
-        self.base_url = "https://api.deepseek.com/v1/chat/completions"
-        self.model = "deepseek-chat"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        Authentication comes from config.yaml (llm.deepseek.api_key) or the DEEPSEEK_API_KEY environment variable.
+        """
+        # All values are module-level constants resolved once at import
+        self.api_key = _API_KEY
+        self.base_url = _BASE_URL
+        self.model = _MODEL
+
+    @classmethod
+    def get_client(cls) -> httpx.Client:
+        """
+        Lazily create the shared httpx client: one TCP+TLS connection is reused across all calls
+        (and multiplexed via HTTP/2 when concurrent agent nodes hit DeepSeek), instead of paying
+        a full handshake per request.
+        """
+        if cls._client is None:
+            cls._client = httpx.Client(http2=True, timeout=60, headers=dict(_HEADERS))
+        return cls._client
+
+    @classmethod
+    def get_async_client(cls) -> httpx.AsyncClient:
+        """
+        Lazily create the shared async httpx client (same pooling/HTTP/2 benefits as get_client,
+        but usable from async LangGraph nodes without blocking the event loop).
+        """
+        if cls._async_client is None:
+            cls._async_client = httpx.AsyncClient(http2=True, timeout=60, headers=dict(_HEADERS))
+        return cls._async_client
+
+    @staticmethod
+    def _extract_response(data: dict) -> str:
+        """Pull the first candidate out of the API payload, raising when there is none."""
+        choices = data.get("choices", [])
+        if choices:
+            return choices[0]["message"]["content"]
+        raise LLMError(f"DeepSeek returned no valid response: {data}")
+
+    @retry(**_RETRY_POLICY)
+    def _call_api(self, payload: dict) -> str:
+        """Single API attempt; transient failures raise and tenacity retries with backoff."""
+        resp = self.get_client().post(self.base_url, json=payload)
+        resp.raise_for_status()
+        return self._extract_response(resp.json())
+
+    @retry(**_RETRY_POLICY)
+    async def _acall_api(self, payload: dict) -> str:
+        """Async single API attempt; transient failures raise and tenacity retries with backoff."""
+        resp = await self.get_async_client().post(self.base_url, json=payload)
+        resp.raise_for_status()
+        return self._extract_response(resp.json())
 
     def chat(self, messages: List, temperature: float = 0.7) -> str:
         """
         Call DeepSeek Chat Completion API and return the first candidate response.
+
+        Raises LLMError when the call still fails after bounded retries.
+        """
+        cached = prompt_cache.lookup(messages, temperature)  # Cache hit skips the whole API round-trip
+        if cached is not None:
+            return cached
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature
+        }
+        try:
+            response = self._call_api(payload)
+        except LLMError:
+            raise
+        except Exception as e:  # Surface a typed error instead of an error string
+            raise LLMError(f"DeepSeek API call failed after retries: {e}") from e
+        prompt_cache.store(messages, temperature, response)
+        return response
+
+    async def achat(self, messages: List, temperature: float = 0.7) -> str:
+        """
+        Async variant of chat: same cache, retry and error handling, but non-blocking so
+        LangGraph can overlap independent LLM nodes instead of serializing their network I/O.
         """
+        cached = prompt_cache.lookup(messages, temperature)  # Cache hit skips the whole API round-trip
+        if cached is not None:
+            return cached
         payload = {
             "model": self.model,
             "messages": messages,
             "temperature": temperature
         }
         try:
-            resp = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json=payload,
-                timeout=60
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            choices = data.get("choices", [])
-            if choices:
-                return choices[0]["message"]["content"]
-            return "[No valid response]"
-        except Exception as e:
-            return f"[API call exception] {str(e)}"
+            response = await self._acall_api(payload)
+        except LLMError:
+            raise
+        except Exception as e:  # Surface a typed error instead of an error string
+            raise LLMError(f"DeepSeek API call failed after retries: {e}") from e
+        prompt_cache.store(messages, temperature, response)
+        return response
 
 
 if __name__ == '__main__':
@@ -0,0 +1,11 @@
+"""
+LLM Error Types
+
+Typed exceptions raised by the LLM wrappers. Raising a real exception (instead of returning a
+stringified error as if it were a model response) lets downstream coordination logic detect the
+failure point and invoke rollback or retry, rather than doing wasted work on garbage output.
+"""
+
+
+class LLMError(Exception):
+    """Raised when an LLM API call still fails after bounded retries."""
@@ -0,0 +1,137 @@
+"""
+LLM Prompt Cache
+
+Two-tier cache placed in front of the LLM wrappers (QwenWrapper / DeepSeekWrapper):
+- Tier 1 (exact): blake2b hash of the serialized messages -> response, bounded LRU
+- Tier 2 (semantic): embedding of the last user message, cosine-similarity lookup
+  (optional, requires fastembed; skipped silently when unavailable)
+
+Cache policy by temperature:
+- temperature > 0.5: bypass the cache entirely (sampling is intentionally diverse)
+- temperature <= 0.5: consult/fill the exact tier
+- temperature <= 0.2: additionally consult/fill the semantic tier (near-deterministic prompts)
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import List, Optional
+
+# Semantic tier dependencies (optional): degrade to exact-match caching when unavailable
+try:
+    import numpy as np
+    from fastembed import TextEmbedding
+    _SEMANTIC_AVAILABLE = True
+except ImportError:
+    _SEMANTIC_AVAILABLE = False
+
+_EXACT_CACHE_SIZE = 1024  # Max entries in the exact LRU tier
+_SEMANTIC_CACHE_SIZE = 1024  # Max entries in the semantic tier (bounded reset when full)
+_SEMANTIC_THRESHOLD = 0.9  # Min cosine similarity for a semantic hit (distance ~0.1)
+_BYPASS_TEMPERATURE = 0.5  # Above this temperature the cache is bypassed entirely
+_SEMANTIC_TEMPERATURE = 0.2  # At or below this temperature the semantic tier is consulted
+
+# Tier 1: exact LRU (message hash -> response)
+_exact_cache: "OrderedDict[str, str]" = OrderedDict()
+
+# Tier 2: semantic store. Vectors accumulate in a plain list (O(1) append, no full-matrix
+# copy per insert); the stacked matrix used for the similarity GEMV is rebuilt lazily on
+# lookup only when inserts have made it stale
+_embedding_model = None
+_semantic_vectors: List = []  # Individual L2-normalized embeddings
+_semantic_matrix = None  # (n, dim) stack of _semantic_vectors, rebuilt lazily
+_semantic_responses: List[str] = []
+
+
+def _messages_key(messages: List) -> str:
+    """Hash the full messages payload into a stable exact-match key."""
+    serialized = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(serialized.encode("utf-8")).hexdigest()
+
+
+def _last_user_content(messages: List) -> str:
+    """Extract the last user message content (the semantic cache key)."""
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message.get("content", "")
+    return ""
+
+
+def _embed(text: str):
+    """Embed text with the lazily-loaded model, L2-normalized for cosine similarity."""
+    global _embedding_model
+    if _embedding_model is None:
+        _embedding_model = TextEmbedding("BAAI/bge-small-en-v1.5")
+    vector = next(iter(_embedding_model.embed([text])))
+    return vector / np.linalg.norm(vector)
+
+
+def lookup(messages: List, temperature: float) -> Optional[str]:
+    """
+    Look up a cached response for the given messages.
+
+    :param messages: Message list as passed to the wrapper's chat()
+    :param temperature: Sampling temperature of the call
+    :return: Cached response, or None on miss/bypass
+    """
+    if temperature > _BYPASS_TEMPERATURE:
+        return None
+
+    # Tier 1: exact match
+    key = _messages_key(messages)
+    cached = _exact_cache.get(key)
+    if cached is not None:
+        _exact_cache.move_to_end(key)
+        return cached
+
+    # Tier 2: semantic match (deterministic prompts only)
+    if temperature <= _SEMANTIC_TEMPERATURE and _SEMANTIC_AVAILABLE and _semantic_responses:
+        global _semantic_matrix
+        user_text = _last_user_content(messages)
+        if user_text:
+            try:
+                query = _embed(user_text)
+                if _semantic_matrix is None or len(_semantic_matrix) != len(_semantic_vectors):
+                    _semantic_matrix = np.vstack(_semantic_vectors)  # Stale after inserts, restack once
+                similarities = _semantic_matrix @ query
+                best = int(similarities.argmax())
+                if float(similarities[best]) >= _SEMANTIC_THRESHOLD:
+                    return _semantic_responses[best]
+            except Exception:
+                return None  # Semantic tier failure is never fatal
+    return None
+
+
+def store(messages: List, temperature: float, response: str) -> None:
+    """
+    Store a response in the cache (no-op for bypassed temperatures and error responses).
+
+    :param messages: Message list as passed to the wrapper's chat()
+    :param temperature: Sampling temperature of the call
+    :param response: LLM response to cache
+    """
+    global _semantic_matrix
+    if temperature > _BYPASS_TEMPERATURE or not response:
+        return  # Never cache bypassed calls or empty responses (failures raise LLMError upstream)
+
+    # Tier 1: exact LRU insert with eviction
+    key = _messages_key(messages)
+    _exact_cache[key] = response
+    _exact_cache.move_to_end(key)
+    while len(_exact_cache) > _EXACT_CACHE_SIZE:
+        _exact_cache.popitem(last=False)
+
+    # Tier 2: semantic insert (deterministic prompts only)
+    if temperature <= _SEMANTIC_TEMPERATURE and _SEMANTIC_AVAILABLE:
+        user_text = _last_user_content(messages)
+        if user_text:
+            try:
+                if len(_semantic_responses) >= _SEMANTIC_CACHE_SIZE:
+                    # Simple bound like the other caches: reset when full (entries are
+                    # re-learned quickly, repeats dominate)
+                    _semantic_vectors.clear()
+                    _semantic_responses.clear()
+                    _semantic_matrix = None
+                _semantic_vectors.append(_embed(user_text))
+                _semantic_responses.append(response)
+            except Exception:
+                pass  # Semantic tier failure is never fatal
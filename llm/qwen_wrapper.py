@@ -1,15 +1,68 @@
+import asyncio
+import functools
+import os
+import types
+
 import dashscope  # Alibaba Cloud official SDK, encapsulates HTTP details for Qwen API requests
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter
 from typing import List  # Data type: list
 
+from common.config_loader import load_config
+from llm import prompt_cache  # Two-tier (exact + semantic) cache in front of the API
+from llm.errors import LLMError
+
+# Resolved once at import: config file first, environment variable override, no per-instantiation
+# os.getenv / dict allocation on the node hot path
+_QWEN_CONFIG = (load_config().get("llm") or {}).get("qwen") or {}
+_API_KEY = os.environ.get("DASHSCOPE_API_KEY") or _QWEN_CONFIG.get("api_key", "")
+_MODEL = _QWEN_CONFIG.get("model", "qwen2.5-72b-instruct")
+_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1/"
+_HEADERS = types.MappingProxyType({
+    "Authorization": f"Bearer {_API_KEY}",
+    "Content-Type": "application/json"
+})
+
 class QwenWrapper:
+    # Shared singleton instance (the wrapper is stateless per call, so one instance is enough)
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> "QwenWrapper":
+        """Return the shared wrapper instance instead of reconstructing one per node call."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
     def __init__(self):  # Initialize Qwen API, set API key, Base URL, model and request headers
-        self.api_key = "sk-bcabe4992cb94e8f896126cef8ee8dea"
-        self.base_url = "https://dashscope.aliyuncs.com/compatible-mode/v1/"
-        self.model = "qwen2.5-72b-instruct"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        # All values are module-level constants resolved once at import
+        self.api_key = _API_KEY
+        self.base_url = _BASE_URL
+        self.model = _MODEL
+        self.headers = _HEADERS
+        # Pre-bind the static kwargs once: per call only messages/temperature vary
+        self._call = functools.partial(
+            dashscope.Generation.call,
+            api_key=self.api_key,  # API key
+            model=self.model,  # Model
+            result_format="message",  # Result format
+            top_p=0.8  # Top-p sampling
+        )
+
+    @retry(wait=wait_exponential_jitter(initial=0.2, max=4), stop=stop_after_attempt(3), reraise=True)
+    def _call_api(self, messages: List, temperature: float) -> str:
+        """
+        Single Qwen API attempt. Transient failures (429/5xx, TCP resets, empty responses)
+        raise, and tenacity retries with exponential backoff before giving up.
+        """
+        resp = self._call(messages=messages, temperature=temperature)  # Call Qwen API (static kwargs pre-bound)
+        if (
+                hasattr(resp, "output")  # If response has output attribute
+                and resp.output is not None
+                and "choices" in resp.output  # And output has choices key
+                and resp.output["choices"]  # And choices value is not empty
+        ):
+            return resp.output["choices"][0]["message"]["content"]  # Return response content
+        raise LLMError(f"Qwen returned no valid response: {getattr(resp, 'message', resp)}")
 
     def chat(self, messages: List, temperature: float = 0.7) -> str:  # Pass message list and temperature, call Qwen API to generate response
         """
@@ -17,26 +70,71 @@ class QwenWrapper:
 
         messages: List of dicts, e.g. [{"role": "user", "content": "Who are you?"}]
         Each element is a dictionary containing 'role' and 'content' keys
+
+        Raises LLMError when the call still fails after bounded retries, so the
+        coordination layer can react instead of consuming a stringified error.
         """
-        try:  # Call Qwen API to generate response, return error message if failed
-            resp = dashscope.Generation.call(  # Call Qwen API
-                api_key=self.api_key,  # API key
-                model=self.model,  # Model
-                messages=messages,  # Message list
-                result_format="message",  # Result format
-                temperature=temperature,  # Temperature
-                top_p = 0.8  # Top-p sampling
+        cached = prompt_cache.lookup(messages, temperature)  # Cache hit skips the whole API round-trip
+        if cached is not None:
+            return cached
+        try:
+            response = self._call_api(messages, temperature)
+        except LLMError:
+            raise
+        except Exception as e:  # Surface a typed error instead of an error string
+            raise LLMError(f"Qwen API call failed after retries: {e}") from e
+        prompt_cache.store(messages, temperature, response)
+        return response
+
+    def stream(self, messages: List, temperature: float = 0.7):
+        """
+        Call Qwen API in streaming mode and yield response deltas as they arrive.
+
+        With incremental_output=True each streamed response carries only the newly
+        generated text, so the caller can surface tokens as soon as the first chunk
+        lands instead of waiting for the full generation. A cache hit yields the
+        cached response as one chunk; once a live stream is drained, the joined
+        deltas are stored so streamed and non-streamed calls share cache entries.
+
+        Raises LLMError when the stream cannot be established or an error response
+        arrives mid-stream.
+        """
+        cached = prompt_cache.lookup(messages, temperature)  # Cache hit skips the whole API round-trip
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        try:
+            responses = self._call(
+                messages=messages, temperature=temperature,
+                stream=True, incremental_output=True
             )
-            if (
-                    hasattr(resp, "output")  # If response has output attribute
-                    and "choices" in resp.output  # And output has choices key
-                    and resp.output["choices"]  # And choices value is not empty
-            ):
-                return resp.output["choices"][0]["message"]["content"]  # Return response content
-            else:
-                return "[No valid response]"  # Otherwise return "No valid response"
-        except Exception as e:
-            return f"[API call exception] {str(e)}"  # If Qwen API call fails, return call exception and error message
+            for resp in responses:
+                if (
+                        hasattr(resp, "output")  # If response has output attribute
+                        and resp.output is not None
+                        and "choices" in resp.output  # And output has choices key
+                        and resp.output["choices"]  # And choices value is not empty
+                ):
+                    delta = resp.output["choices"][0]["message"]["content"]
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+                else:
+                    raise LLMError(f"Qwen returned no valid response: {getattr(resp, 'message', resp)}")
+        except LLMError:
+            raise
+        except Exception as e:  # Surface a typed error instead of an error string
+            raise LLMError(f"Qwen streaming call failed: {e}") from e
+        prompt_cache.store(messages, temperature, "".join(chunks))
+
+    async def achat(self, messages: List, temperature: float = 0.7) -> str:
+        """
+        Async variant of chat: the dashscope SDK is synchronous, so the blocking call runs in a
+        worker thread (asyncio.to_thread) and does not block the event loop. This lets LangGraph
+        overlap independent LLM nodes instead of serializing their network I/O.
+        """
+        return await asyncio.to_thread(self.chat, messages, temperature)
 
 
 if __name__ == '__main__':  # Test Qwen API, pass message list, print response content
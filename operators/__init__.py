@@ -8,6 +8,9 @@ Operator classification:
 - Physical operators: Interact with external systems (YOLO, database execution)
 - Logical operators: Data processing and decision-making (SQL generation, perception code generation, intent classification, routing, filtering)
 """
+import importlib
+import sys
+from functools import lru_cache
 from typing import Dict, Callable, Any
 
 # Operator registry: Records all available operators
@@ -20,6 +23,13 @@ OPERATOR_REGISTRY: Dict[str, Dict[str, Any]] = {
             "module": "operators.perception.yolo_detector",
             "function": "detect_objects",
             "description": "Detect objects in images using YOLOv8 model"
+        },
+        "yolo_detector_batch": {
+            "name": "YOLO Batch Object Detection Operator",
+            "type": "physical",
+            "module": "operators.perception.yolo_detector",
+            "function": "detect_objects_batch",
+            "description": "Detect objects in several images with one batched YOLOv8 forward pass"
         }
     },
     # Execution operators (physical operators)
@@ -30,6 +40,13 @@ OPERATOR_REGISTRY: Dict[str, Dict[str, Any]] = {
             "module": "operators.execution.sql_executor",
             "function": "execute_sql_query",
             "description": "Execute a single SQL query and return results"
+        },
+        "sql_batch_executor": {
+            "name": "SQL Batch Execution Operator",
+            "type": "physical",
+            "module": "operators.execution.sql_executor",
+            "function": "execute_sql_batch",
+            "description": "Execute several independent SQL queries concurrently on DuckDB cursors"
         }
     },
     # Coding operators (logical operators)
@@ -104,27 +121,48 @@ OPERATOR_REGISTRY: Dict[str, Dict[str, Any]] = {
 }
 
 
+# Flat index over the nested registry, precomputed at import: lookups do a single hash probe
+# on (category, name) instead of two nested dict lookups plus two membership checks
+_FLAT_REGISTRY = {
+    (category, name): info
+    for category, ops in OPERATOR_REGISTRY.items()
+    for name, info in ops.items()
+}
+
+
+@lru_cache(maxsize=None)
+def _resolve_operator(category: str, operator_name: str) -> Callable:
+    """
+    Resolve an operator entry to its function (cached: import + getattr happen once per operator).
+
+    :param category: Operator category
+    :param operator_name: Operator name
+    :return: Operator function
+    """
+    operator_info = _FLAT_REGISTRY[(category, operator_name)]
+    module_path = operator_info["module"]
+    function_name = operator_info["function"]
+
+    # Already-imported modules are taken straight from sys.modules, avoiding the
+    # import machinery (and its lock) on the hot path
+    module = sys.modules.get(module_path) or importlib.import_module(module_path)
+    return getattr(module, function_name)
+
+
 def get_operator(category: str, operator_name: str) -> Callable:
     """
     Get specified operator from operator pool.
-    
+
     :param category: Operator category (perception, execution, coding, coordination)
     :param operator_name: Operator name
     :return: Operator function
     """
-    if category not in OPERATOR_REGISTRY:
-        raise ValueError(f"Unknown operator category: {category}")
-    if operator_name not in OPERATOR_REGISTRY[category]:
+    if (category, operator_name) not in _FLAT_REGISTRY:  # Single probe covers both error cases
+        if category not in OPERATOR_REGISTRY:
+            raise ValueError(f"Unknown operator category: {category}")
         raise ValueError(f"Operator {operator_name} does not exist in category {category}")
-    
-    operator_info = OPERATOR_REGISTRY[category][operator_name]
-    module_path = operator_info["module"]
-    function_name = operator_info["function"]
-    
-    # Dynamically import operator
-    import importlib
-    module = importlib.import_module(module_path)
-    return getattr(module, function_name)
+
+    return _resolve_operator(category, operator_name)
 
 
 def list_operators(category: str = None) -> Dict[str, Dict[str, Any]]:
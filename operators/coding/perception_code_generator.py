@@ -18,7 +18,18 @@ def generate_perception_instruction(state: AgentState) -> ExecutionInstruction:
     image_path = state.get("image_path")
     if not image_path:
         raise ValueError("image_path not provided, cannot generate perception instruction")
-    
+
+    # Several queued images are dispatched as one batched YOLO forward pass, which amortizes
+    # the per-call preprocessing/launch overhead across the whole list
+    if isinstance(image_path, (list, tuple)):
+        instruction: ExecutionInstruction = {
+            "operator": "yolo_detector_batch",  # Operator name
+            "params": {
+                "image_paths": list(image_path)  # Operator parameters
+            }
+        }
+        return instruction
+
     # Generate execution instruction: call YOLO detection operator
     instruction: ExecutionInstruction = {
         "operator": "yolo_detector",  # Operator name
@@ -7,94 +7,156 @@ Generates SQL queries for geographic locations based on detected object labels a
 import re
 from typing import List, Optional
 
-from agent.shared.state import ObjectBox
+from agent.shared.state import ObjectBox, SqlStatement
+
+
+def _object_cx(box: ObjectBox) -> float:
+    """Object center-x coordinate from its bounding box."""
+    return (box['bbox'][0] + box['bbox'][2]) * 0.5
+
+
+def _direction_from_cx(a_cx: float, b_cx: float, sunset_cx: float) -> str:
+    """Direction judgment on precomputed center-x values (see compare_relative_longitude)."""
+    return "WEST" if abs(a_cx - sunset_cx) < abs(b_cx - sunset_cx) else "EAST"
+    # abs(a's coordinate - sunset coordinate) < abs(b's coordinate - sunset coordinate) means a is horizontally closer to sunset in the image
+    # Sunset is always in the west direction, being horizontally closer to sunset in the image means its position is more to the west in the real world
 
 
 def compare_relative_longitude(a: ObjectBox, b: ObjectBox, sunset: ObjectBox) -> str:
     """
     Determine whether a is west or east of b relative to sunset
-    
+
     :param a: Object A
     :param b: Object B
     :param sunset: Sunset object (as directional reference)
     :return: "WEST" or "EAST"
     """
-    def cx(box: ObjectBox) -> float:  # Define object center coordinates using bounding box coordinates
-        return (box['bbox'][0] + box['bbox'][2]) / 2.0
-    sunset_cx = cx(sunset)
-    a_cx = cx(a)
-    b_cx = cx(b)
-    return "WEST" if abs(a_cx - sunset_cx) < abs(b_cx - sunset_cx) else "EAST"
-    # abs(a's coordinate - sunset coordinate) < abs(b's coordinate - sunset coordinate) means a is horizontally closer to sunset in the image
-    # Sunset is always in the west direction, being horizontally closer to sunset in the image means its position is more to the west in the real world
+    return _direction_from_cx(_object_cx(a), _object_cx(b), _object_cx(sunset))
 
 
 # detect.py calls YOLOv8 model to identify objects, here we use object bounding box coordinates
 # Object coordinates in absolute direction (sunset is absolutely in the west) reflect the spatial relationship of objects
 # Set SQL query statement condition part based on different object spatial relationships
 
-def generate_spatial_sql(a: ObjectBox, b: ObjectBox, sunset: Optional[ObjectBox]) -> str:
+# SQL template: the query skeleton is independent of perception results, so it can be generated
+# in parallel with perception code generation (fan-out branch); only the direction condition
+# is filled in after perception completes.
+# The object labels are bound as prepared-statement parameters (? placeholders) rather than
+# spliced into the text: this avoids SQL injection through detected labels and leaves only
+# three distinct statement texts (WEST / EAST / no direction), so DuckDB can reuse one parsed
+# query plan across all O(N²) object pairs.
+# The readable multi-line form is collapsed to single spaces once at import time, so each
+# generated SQL is a plain .format() with no per-call regex pass over the statement.
+_SQL_TEMPLATE = """
+    WITH geo_a AS (
+        SELECT * FROM geo_table WHERE name LIKE '%' || ? || '%'
+    ), geo_b AS (
+        SELECT * FROM geo_table WHERE name LIKE '%' || ? || '%'
+    )
+    SELECT
+        a.name AS a_name,
+        a.address AS a_address,
+        b.name AS b_name,
+        b.address AS b_address,
+        ROUND((st_distance(a.location, b.location) / 0.0111) * 1000) AS distance
+    FROM geo_a AS a
+    JOIN geo_b AS b ON 1=1
+    WHERE 1=1 AND distance > 1 AND distance < 100
+    {direction_condition}ORDER BY distance
+    LIMIT 3;
+"""
+_SQL_TEMPLATE = re.sub(r'\s+', ' ', _SQL_TEMPLATE.strip())
+
+# Direction conditions carry their own trailing space so the filled template stays
+# single-spaced whether or not a condition is present
+_WEST_CONDITION = "AND ST_X(a.location) <= ST_X(b.location) "
+_EAST_CONDITION = "AND ST_X(b.location) <= ST_X(a.location) "
+
+
+def build_sql_template() -> str:
+    """
+    Build the SQL query template (object-independent part of SQL generation).
+
+    The template contains placeholders for object labels and direction condition,
+    which are filled in by generate_spatial_sql after perception completes.
+
+    :return: SQL query template with placeholders
+    """
+    return _SQL_TEMPLATE
+
+
+def generate_spatial_sql(a: ObjectBox, b: ObjectBox, sunset: Optional[ObjectBox], template: Optional[str] = None) -> SqlStatement:
     """
     Generate SQL query for spatial relationship between two objects
-    
+
     :param a: Object A
     :param b: Object B
     :param sunset: Sunset object (optional, used for direction judgment)
-    :return: SQL query statement
+    :param template: SQL query template (optional, defaults to the built-in template)
+    :return: (SQL query statement, bound parameters): labels are passed as prepared-statement
+             parameters, not spliced into the text
     """
     direction_condition = ""
     if sunset:
         direction = compare_relative_longitude(a, b, sunset)
         if direction == "WEST":  # Set SQL query statement condition based on west or east direction
-            direction_condition = " AND ST_X(a.location) <= ST_X(b.location) "
+            direction_condition = _WEST_CONDITION
         else:
-            direction_condition = " AND ST_X(b.location) <= ST_X(a.location) "
-
-    sql = f"""
-        WITH geo_a AS (
-            SELECT * FROM geo_table WHERE name LIKE '%{a['label']}%'
-        ), geo_b AS (
-            SELECT * FROM geo_table WHERE name LIKE '%{b['label']}%'
-        )
-        SELECT
-            a.name AS a_name,
-            a.address AS a_address,
-            b.name AS b_name,
-            b.address AS b_address,
-            ROUND((st_distance(a.location, b.location) / 0.0111) * 1000) AS distance
-        FROM geo_a AS a
-        JOIN geo_b AS b ON 1=1
-        WHERE 1=1 AND distance > 1 AND distance < 100
-        {direction_condition}
-        ORDER BY distance
-        LIMIT 3;
-    """
-    return re.sub(r'\s+', ' ', sql.strip())
+            direction_condition = _EAST_CONDITION
+
+    # The template is already whitespace-collapsed at import time, so a single .format()
+    # yields the final compact SQL without any per-call regex pass
+    sql = (template or _SQL_TEMPLATE).format(direction_condition=direction_condition)
+    return sql, (a['label'], b['label'])
     # Spatial query, uses DuckDB's spatial function st_distance to calculate distance
     # Distance filtering, only returns results within 1-100 meters between a and b
     # Result sorting, sorted by distance in ascending order, take top 3
 
 
-def generate_sql_queries(objects: List[ObjectBox]) -> List[str]:
+def generate_sql_queries(objects: List[ObjectBox], template: Optional[str] = None) -> List[SqlStatement]:
     """
     Generate SQL query statements for all object combinations
     Generate SQL query statements based on detected object labels
-    
+
     :param objects: List of detected objects
-    :return: List of SQL query statements
+    :param template: SQL query template (optional, generated in the parallel template branch)
+    :return: List of (SQL query statement, bound parameters) pairs
     """
     sql_list = []
-    sunset_obj = next((obj for obj in objects if obj["label"] == "夕阳"), None)
+    tmpl = template or _SQL_TEMPLATE
+    # Single pass over the detections: extract the sunset reference (first occurrence, as
+    # before), filter it out of the pairable objects, and precompute each center-x — the
+    # pair loop below would otherwise recompute the sunset cx O(N²) times and every other
+    # cx O(N) times, on top of re-testing labels per pair
+    non_sunset = []
+    cxs = []
+    sunset_cx = None
+    for obj in objects:
+        cx = _object_cx(obj)
+        if obj["label"] == "夕阳":
+            if sunset_cx is None:  # Sunset is only used as reference, not included in queries
+                sunset_cx = cx
+        else:
+            non_sunset.append(obj)
+            cxs.append(cx)
     # Enumerate all possible object pair (a, b) combinations: a != b
-    for i in range(len(objects)):
-        for j in range(i + 1, len(objects)):
-            obj_a = objects[i]
-            obj_b = objects[j]
-
-            if obj_a["label"] == "夕阳" or obj_b["label"] == "夕阳" or obj_a["label"] == obj_b["label"]:
-                continue  # Sunset is only used as reference, not included in query, same labels are also skipped
-            sql = generate_spatial_sql(obj_a, obj_b, sunset_obj)
-            sql_list.append(sql)
+    for i in range(len(non_sunset)):
+        for j in range(i + 1, len(non_sunset)):
+            obj_a = non_sunset[i]
+            obj_b = non_sunset[j]
+
+            if obj_a["label"] == obj_b["label"]:
+                continue  # Same labels are skipped
+            direction_condition = ""
+            if sunset_cx is not None:
+                if _direction_from_cx(cxs[i], cxs[j], sunset_cx) == "WEST":
+                    direction_condition = _WEST_CONDITION
+                else:
+                    direction_condition = _EAST_CONDITION
+            sql_list.append((
+                tmpl.format(direction_condition=direction_condition),
+                (obj_a['label'], obj_b['label']),
+            ))
     return sql_list
 
 # Sunset is not treated as an object, here we have obtained SQL queries for spatial relationships between all object pairs
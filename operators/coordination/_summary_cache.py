@@ -0,0 +1,144 @@
+"""
+Semantic summary cache (internal helper for the result summarizer)
+
+Caches generated natural-language summaries keyed on the analysis outcome (detected labels +
+top location pairs). A repeated or near-identical outcome — common during development and for
+photos of the same landmarks — returns the cached summary and skips the entire LLM round-trip.
+
+Lookup is two-tier: an exact key match first, then embedding cosine similarity against the
+cached keys (fastembed, the same optional local model the intent classifier uses). When
+fastembed is unavailable only the exact tier works. The cache is persisted to a pickle
+sidecar at process exit so hits survive across runs.
+"""
+import atexit
+import pickle
+from pathlib import Path
+from typing import List, Optional
+
+# Optional local embedding dependencies: degrade to exact-match caching when unavailable
+try:
+    import numpy as np
+    from fastembed import TextEmbedding
+    _SEMANTIC_AVAILABLE = True
+except ImportError:
+    _SEMANTIC_AVAILABLE = False
+
+_SIMILARITY_THRESHOLD = 0.92  # Cosine similarity above this counts as the same outcome
+_MAX_ENTRIES = 256  # Keys and summaries are small, simple bound is enough
+_CACHE_PATH = Path(__file__).resolve().parent / "_summary_cache.pkl"
+
+# Cache state (lazy-loaded from the pickle sidecar on first use)
+_model = None
+_keys: List[str] = []
+_summaries: List[str] = []
+_embeddings = None  # (len(_keys), dim) matrix, L2-normalized rows
+_loaded = False
+_dirty = False
+
+
+def build_cache_key(object_labels: List[str], location_pairs: List[tuple]) -> str:
+    """
+    Build the normalized cache key for one analysis outcome.
+
+    :param object_labels: Detected high-confidence object labels
+    :param location_pairs: Top location tuples (name pairs at fixed positions)
+    :return: Deterministic key string, order-insensitive in the labels
+    """
+    labels_part = "|".join(sorted(object_labels))
+    pairs_part = "|".join(f"{a}~{b}" for a, b in location_pairs)
+    return f"{labels_part}##{pairs_part}"
+
+
+def _load() -> None:
+    """Load the persisted cache once (best-effort: a corrupt sidecar just starts empty)."""
+    global _keys, _summaries, _embeddings, _loaded
+    if _loaded:
+        return
+    _loaded = True
+    if _CACHE_PATH.exists():
+        try:
+            with open(_CACHE_PATH, "rb") as f:
+                _keys, _summaries, _embeddings = pickle.load(f)
+        except Exception:
+            _keys, _summaries, _embeddings = [], [], None
+
+
+def _save() -> None:
+    """Persist the cache at process exit (best-effort, only when something was added)."""
+    if not _dirty:
+        return
+    try:
+        with open(_CACHE_PATH, "wb") as f:
+            pickle.dump((_keys, _summaries, _embeddings), f)
+    except Exception:
+        pass  # Cache persistence is an optimization, never an error
+
+
+atexit.register(_save)
+
+
+def _embed(key: str):
+    """Embed a key into an L2-normalized vector (None when fastembed is unavailable)."""
+    global _model
+    if not _SEMANTIC_AVAILABLE:
+        return None
+    try:
+        if _model is None:
+            _model = TextEmbedding("BAAI/bge-small-en-v1.5")
+        vector = next(iter(_model.embed([key])))
+        return vector / np.linalg.norm(vector)
+    except Exception:
+        return None  # Embedding failure degrades to exact-match caching
+
+
+def lookup(key: str) -> Optional[str]:
+    """
+    Look up a cached summary for an analysis outcome.
+
+    :param key: Cache key from build_cache_key
+    :return: Cached summary, or None on a miss
+    """
+    _load()
+    if not _keys:
+        return None
+    # Tier 1: exact key match, no embedding work
+    try:
+        return _summaries[_keys.index(key)]
+    except ValueError:
+        pass
+    # Tier 2: cosine similarity against all cached keys in one matrix-vector product
+    if _embeddings is None or len(_keys) != len(_embeddings):
+        return None
+    query = _embed(key)
+    if query is None:
+        return None
+    similarities = _embeddings @ query
+    best = int(similarities.argmax())
+    if float(similarities[best]) >= _SIMILARITY_THRESHOLD:
+        return _summaries[best]
+    return None
+
+
+def store(key: str, summary: str) -> None:
+    """
+    Store a freshly generated summary for an analysis outcome.
+
+    :param key: Cache key from build_cache_key
+    :param summary: Generated natural-language summary
+    """
+    global _keys, _summaries, _embeddings, _dirty
+    _load()
+    if not summary or key in _keys:
+        return
+    if len(_keys) >= _MAX_ENTRIES:  # Simple bound, matching the other caches in the project
+        _keys, _summaries, _embeddings = [], [], None
+    _keys.append(key)
+    _summaries.append(summary)
+    vector = _embed(key)
+    if vector is not None:
+        if _embeddings is None or len(_embeddings) != len(_keys) - 1:
+            _embeddings = vector.reshape(1, -1)
+            # A reset matrix only covers the newest key; older keys stay exact-match only
+        else:
+            _embeddings = np.vstack([_embeddings, vector])
+    _dirty = True
@@ -3,29 +3,43 @@ Chat Response Operator (Logical Operator)
 
 Uses LLM to respond to user's chat requests.
 """
+import logging
+
 from agent.shared.state import AgentState
-from llm.qwen_wrapper import QwenWrapper
+from llm.errors import LLMError
+
+logger = logging.getLogger(__name__)
 
 
-def chat_responder_operator(state: AgentState) -> AgentState:
+async def chat_responder_operator(state: AgentState) -> AgentState:
     """
-    LangGraph node function: LLM chat response
-    
+    LangGraph node function: LLM chat response (async so LangGraph can overlap I/O)
+
     :param state: Agent state
     :return: Updated state (contains chat_response)
     """
+    # Deferred import: the LLM SDK behind QwenWrapper is slow to load, so importing the
+    # operator module (e.g. when building the graph) should not pay for it
+    from llm.qwen_wrapper import QwenWrapper
+
     user_text = state.get("user_text", "")  # Get user input string (empty if no input)
-    qwen = QwenWrapper()  # Create instance to call Qwen model, create new instance for each call
+    qwen = QwenWrapper.instance()  # Shared Qwen wrapper instance (avoids per-call construction)
 
     messages = [
         {"role": "system", "content": "You are a helpful assistant."},
         {"role": "user", "content": user_text}
     ]
-    chat_response = qwen.chat(messages)  # Save LLM response to chat_response field
-    new_state = state.copy()  # Create new state, add response entry, output new item
-    new_state["chat_response"] = chat_response
-    print("\n================================[SqlExecutionAgent]=================================\n")
-    print("SqlExecutionAgent called chat response function:")
-    print(chat_response)
-    return new_state
+    try:
+        chat_response = await qwen.achat(messages)  # Save LLM response to chat_response field (non-blocking)
+    except LLMError as e:  # Retries already happened in the wrapper, report the failure to the user
+        chat_response = f"[API call exception] {e}"
+    # DEBUG-gated report: at INFO and above no per-response formatting work happens at all
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "\n================================[SqlExecutionAgent]=================================\n\n"
+            "SqlExecutionAgent called chat response function:\n%s", chat_response
+        )
+    # Return only the updated channel (partial update), LangGraph merges it into the shared state
+    # instead of us copying the whole dict just to set one key
+    return {"chat_response": chat_response}
 
@@ -2,52 +2,306 @@
 Intent Classification Operator (Logical Operator)
 
 Classifies intent type based on user input: chat or reasoning.
+
+Classification is a cascade of increasingly expensive tiers:
+1. Fingerprint gate: no image means chat, and trivial greetings / obvious location questions
+   are matched by precompiled regexes in microseconds
+2. Local semantic router: embedding + cosine similarity against prototype utterances
+3. LLM fallback: only when the router is unavailable or the similarity margin is ambiguous
 """
+import json
+import re
+from typing import List, Optional
+
 from agent.shared.state import AgentState
-from llm.qwen_wrapper import QwenWrapper
+from llm.errors import LLMError
+
+# Local semantic router dependencies (optional): fall back to the LLM when unavailable
+try:
+    import numpy as np
+    from fastembed import TextEmbedding
+    _ROUTER_AVAILABLE = True
+except ImportError:
+    _ROUTER_AVAILABLE = False
+
+# Seed utterances per intent class, encoded once into a prototype matrix at first use
+_CHAT_SEEDS = [
+    "Hi",
+    "Hello there",
+    "Who are you?",
+    "What can you do?",
+    "Tell me a joke",
+    "How's the weather today?",
+    "Good morning",
+    "Thanks for your help",
+    "Can you introduce yourself?",
+    "Let's chat for a while",
+]
+_REASONING_SEEDS = [
+    "Where was this photo taken?",
+    "Analyze the shooting location of this image",
+    "Identify the location in this picture",
+    "Which city is this photo from?",
+    "Find the geographic location of the uploaded image",
+    "Where is this place in the photo?",
+    "Locate where this picture was shot",
+    "What landmarks are in this image?",
+    "Reason about the geographic information in this photo",
+    "Determine the shooting spot of this image",
+]
+
+_ROUTER_MARGIN = 0.08  # Below this top-1/top-2 similarity margin, fall back to the LLM
+
+# Near-deterministic sampling for the LLM fallback: the prompt demands a single-token label,
+# so diversity only hurts, and a temperature at or below 0.2 lets both tiers of the prompt
+# cache engage (the wrapper default of 0.7 bypasses it entirely)
+_LLM_TEMPERATURE = 0.1
+
+_VALID_INTENTS = frozenset(("chat", "reasoning"))  # Hoisted so no set literal is rebuilt per call
 
+# Fingerprint tier: precompiled regexes resolve the trivially classifiable inputs in microseconds,
+# before any embedding or LLM work
+_CHAT_FINGERPRINTS = re.compile(
+    r"^(hi|hello|hey|good (morning|afternoon|evening)|who are you|what can you do"
+    r"|tell me a joke|how.?s the weather|thanks?)\b", re.I
+)
+_REASONING_FINGERPRINTS = re.compile(
+    r"photo|image|picture|location|taken|uploaded|landmark|拍摄|照片|图片|位置|地点", re.I
+)
 
-def classify_intent(user_text: str) -> str:
+
+def classify_intent_fingerprint(user_text: str) -> Optional[str]:
     """
-    Classify user intent
-    
+    Classify intent via the cheap fingerprint regexes.
+
+    :param user_text: User input text
+    :return: "chat" / "reasoning", or None when no fingerprint matches
+    """
+    if not user_text:
+        return "chat"
+    if _CHAT_FINGERPRINTS.match(user_text):
+        return "chat"
+    if _REASONING_FINGERPRINTS.search(user_text):
+        return "reasoning"
+    return None
+
+# System message for the LLM fallback, kept as a module-level constant so nothing is rebuilt
+# per call and the message prefix is byte-identical across calls — provider-side prompt-prefix
+# caching (DeepSeek/DashScope) keys off the exact prefix bytes and then only pays prefill for
+# the short dynamic suffix
+_INTENT_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are an intent classification assistant, you can only choose one of two labels:\n"
+        "1. chat: indicates the user just wants to chat or ask questions\n"
+        "2. reasoning: indicates the user uploaded an image and wants to analyze the shooting location, identify location, or reason about geographic information\n"
+        "Please strictly reply with only one label: chat or reasoning, do not add any other content."
+    ),
+}
+
+# Cache router model and prototype matrix (load once, avoid repeated encoding)
+_router_model = None
+_prototype_matrix = None  # (len(chat)+len(reasoning), dim), L2-normalized rows
+_NUM_CHAT_SEEDS = len(_CHAT_SEEDS)
+
+
+def _get_semantic_router():
+    """Lazily load the embedding model and encode the seed utterances into a prototype matrix."""
+    global _router_model, _prototype_matrix
+    if _router_model is None:
+        _router_model = TextEmbedding("BAAI/bge-small-en-v1.5")
+        embeddings = np.vstack(list(_router_model.embed(_CHAT_SEEDS + _REASONING_SEEDS)))
+        # Normalize rows so that matrix @ query is cosine similarity
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        _prototype_matrix = embeddings
+    return _router_model, _prototype_matrix
+
+
+def classify_intent_semantic(user_text: str) -> Optional[str]:
+    """
+    Classify intent locally via embedding cosine similarity against the seed prototypes.
+
+    :param user_text: User input text
+    :return: "chat" / "reasoning", or None when the router is unavailable or the margin is ambiguous
+    """
+    if not _ROUTER_AVAILABLE or not user_text:
+        return None
+    try:
+        model, prototypes = _get_semantic_router()
+        query = next(iter(model.embed([user_text])))
+        query = query / np.linalg.norm(query)
+        similarities = prototypes @ query  # Single GEMV against all prototypes
+    except Exception:
+        return None  # Router failure falls through to the LLM
+    best_chat = float(similarities[:_NUM_CHAT_SEEDS].max())
+    best_reasoning = float(similarities[_NUM_CHAT_SEEDS:].max())
+    if abs(best_chat - best_reasoning) < _ROUTER_MARGIN:
+        return None  # Too close to call, let the LLM decide
+    return "chat" if best_chat > best_reasoning else "reasoning"
+
+
+# Memoize classification results: the cascade is deterministic on its input, so repeated
+# user texts (replays, tests, repeat users) skip every tier including the LLM round-trip
+_INTENT_CACHE = {}
+_INTENT_CACHE_SIZE = 1024
+
+
+def _remember_intent(user_text: str, intent: str) -> None:
+    """Store a classification result in the bounded memoization cache."""
+    if len(_INTENT_CACHE) >= _INTENT_CACHE_SIZE:  # Simple bound: entries are tiny, repeats dominate
+        _INTENT_CACHE.clear()
+    _INTENT_CACHE[user_text] = intent
+
+
+async def classify_intent(user_text: str) -> str:
+    """
+    Classify user intent (memoized by user_text)
+
     :param user_text: User input text
     :return: "chat" or "reasoning"
     """
-    qwen = QwenWrapper()  # Create instance to call Qwen model, create new instance for each call
-    messages = [  # System prompt
-        {
-            "role": "system",
-            "content": (
-                "You are an intent classification assistant, you can only choose one of two labels:\n"
-                "1. chat: indicates the user just wants to chat or ask questions\n"
-                "2. reasoning: indicates the user uploaded an image and wants to analyze the shooting location, identify location, or reason about geographic information\n"
-                "Please strictly reply with only one label: chat or reasoning, do not add any other content."
-            )
-        },
+    cached = _INTENT_CACHE.get(user_text)
+    if cached is not None:
+        return cached
+    intent = await _classify_intent_uncached(user_text)
+    if intent is None:
+        # LLM unavailable after retries: degrade to the chat path WITHOUT memoizing, so the
+        # same text is re-classified once the API recovers instead of being misrouted forever
+        return "chat"
+    _remember_intent(user_text, intent)
+    return intent
+
+
+async def _classify_intent_uncached(user_text: str) -> Optional[str]:
+    """
+    Run the full classification cascade without memoization.
+
+    :param user_text: User input text
+    :return: "chat" / "reasoning", or None when the LLM fallback tier failed (the caller
+             degrades to chat without caching the transient outcome)
+    """
+    # Tier 1: fingerprint regexes, essentially free
+    fingerprinted = classify_intent_fingerprint(user_text)
+    if fingerprinted is not None:
+        return fingerprinted
+
+    # Tier 2: local semantic router, deterministic, no network round-trip
+    routed = classify_intent_semantic(user_text)
+    if routed is not None:
+        return routed
+
+    # Deferred import: only the LLM fallback tier needs the (slow-to-load) SDK behind QwenWrapper
+    from llm.qwen_wrapper import QwenWrapper
+
+    qwen = QwenWrapper.instance()  # Shared Qwen wrapper instance (avoids per-call construction)
+    messages = [  # System prompt (constant prefix first, dynamic user content last)
+        _INTENT_SYSTEM_MSG,
         {
             "role": "user",
             "content": f"User input is as follows:\n{user_text}\nPlease determine the user's intent type:"
         }
     ]
-    intent = qwen.chat(messages).strip().lower()  # LLM-Qwen gets user input interaction form
-    if intent not in {"chat", "reasoning"}:  # Other options default to chat
+    try:
+        response = await qwen.achat(messages, temperature=_LLM_TEMPERATURE)  # LLM-Qwen gets user input interaction form (non-blocking)
+    except LLMError:
+        return None  # LLM unavailable after retries: transient outcome, the caller degrades uncached
+    intent = response.strip().lower()
+    if intent not in _VALID_INTENTS:  # Other options default to chat
         intent = "chat"
     return intent
 
 
-def classify_intent_operator(state: AgentState) -> AgentState:
+# System message for the batch LLM fallback (several inputs classified in one round-trip)
+_BATCH_INTENT_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are an intent classification assistant, you can only choose one of two labels per input:\n"
+        "1. chat: indicates the user just wants to chat or ask questions\n"
+        "2. reasoning: indicates the user uploaded an image and wants to analyze the shooting location, identify location, or reason about geographic information\n"
+        "You will receive a numbered list of user inputs. Reply with ONLY a JSON array of labels, "
+        "one per input, in the same order, e.g. [\"chat\", \"reasoning\"]. Do not add any other content."
+    ),
+}
+
+
+async def classify_intents(user_texts: List[str]) -> List[str]:
     """
-    LangGraph node function: Intent classification
-    
+    Classify several user inputs at once (batch entry point for replays / queued turns).
+
+    The cheap tiers (cache, fingerprints, semantic router) run per input as usual; only the
+    inputs that would each need an LLM round-trip are folded into a single batched request,
+    amortizing the per-call network overhead.
+
+    :param user_texts: List of user input texts
+    :return: List of "chat" / "reasoning" labels, same order as the inputs
+    """
+    results: List[Optional[str]] = []
+    pending: List[int] = []  # Indices that fell through every local tier
+    degraded = set()  # Indices answered by the error fallback: never memoized (see below)
+    for idx, text in enumerate(user_texts):
+        intent = _INTENT_CACHE.get(text)
+        if intent is None:
+            intent = classify_intent_fingerprint(text)
+        if intent is None:
+            intent = classify_intent_semantic(text)
+        results.append(intent)
+        if intent is None:
+            pending.append(idx)
+
+    if pending:
+        # Deferred import: only the LLM fallback tier needs the (slow-to-load) SDK behind QwenWrapper
+        from llm.qwen_wrapper import QwenWrapper
+
+        qwen = QwenWrapper.instance()
+        numbered = "\n".join(f"{i}. {user_texts[p]}" for i, p in enumerate(pending, 1))
+        messages = [
+            _BATCH_INTENT_SYSTEM_MSG,
+            {
+                "role": "user",
+                "content": f"User inputs are as follows:\n{numbered}\nPlease determine each input's intent type:"
+            }
+        ]
+        labels = []
+        try:
+            response = await qwen.achat(messages, temperature=_LLM_TEMPERATURE)
+            # Tolerate code fences / surrounding prose: parse the first JSON array in the reply
+            match = re.search(r"\[.*?\]", response, re.S)
+            if match:
+                labels = json.loads(match.group(0))
+        except (LLMError, ValueError):
+            labels = []  # LLM unavailable or unparseable: degrade the pending inputs to chat
+        for i, p in enumerate(pending):
+            label = labels[i].strip().lower() if i < len(labels) and isinstance(labels[i], str) else None
+            if label in _VALID_INTENTS:
+                results[p] = label
+            else:
+                # Error fallback (call failed, reply unparseable, or label missing/invalid):
+                # degrade to chat for this run but leave the cache alone, so the same text is
+                # re-classified once the API recovers instead of being misrouted forever
+                results[p] = "chat"
+                degraded.add(p)
+
+    for idx, (text, intent) in enumerate(zip(user_texts, results)):
+        if idx not in degraded:
+            _remember_intent(text, intent)
+    return results
+
+
+async def classify_intent_operator(state: AgentState) -> AgentState:
+    """
+    LangGraph node function: Intent classification (async so LangGraph can overlap I/O)
+
     :param state: Agent state
     :return: Updated state (contains intent field)
     """
     user_input = state.get("user_text", "")  # Get user input string (empty if no input)
-    intent = classify_intent(user_input)
-    new_state = state.copy()  # Create new state, new state intent is intent, return new state
-    new_state["intent"] = intent
-    return new_state
+    if not state.get("image_path"):
+        intent = "chat"  # Reasoning needs an uploaded image: without one, skip every classification tier
+    else:
+        intent = await classify_intent(user_input)
+    # Return only the updated channel (partial update), LangGraph merges it into the shared state
+    # instead of us copying the whole dict just to set one key
+    return {"intent": intent}
 
 
 def route_intent_condition(state: AgentState) -> str:
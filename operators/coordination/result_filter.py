@@ -3,27 +3,31 @@ Result Filtering Operator (Logical Operator)
 
 Filters out SQLs with empty query results, combines SQLs with results and data for output.
 """
+import io
+import logging
 from typing import List, Dict, Any
 
 from agent.shared.state import AgentState
 
+logger = logging.getLogger(__name__)
 
-def filter_results(sql_statements: List[str], query_results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+_PREVIEW_ROWS = 5  # Results are sorted by distance ascending, only the best rows are worth printing
+
+
+def filter_results(sql_statements: List[Any], query_results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
     """
     Filter out SQLs with empty query results, combine SQLs with results and data for output.
-    
-    :param sql_statements: List of SQL statements
+
+    :param sql_statements: List of (SQL statement, bound parameters) pairs
     :param query_results: Query results for each SQL statement
     :return: SQL + Result pairs containing actual results
     """
-    valid_results = []
-    for sql, result in zip(sql_statements, query_results):
-        if isinstance(result, list) and len(result) > 0:
-            valid_results.append({
-                "sql": sql,
-                "result": result
-            })
-    return valid_results
+    # Single comprehension pass: builds the pair list at C speed instead of per-item appends
+    return [
+        {"sql": sql, "params": params, "result": result}
+        for (sql, params), result in zip(sql_statements, query_results)
+        if isinstance(result, list) and result
+    ]
 
 
 def filter_result_operator(state: AgentState) -> AgentState:
@@ -33,32 +37,38 @@ def filter_result_operator(state: AgentState) -> AgentState:
     :param state: Agent state
     :return: Updated state (contains filter_results)
     """
-    print("\n================================[SqlExecutionAgent]=================================\n")
-    print("SqlExecutionAgent called result filtering function:")
-    print("Summarizing valid results based on executed SQLs and query results:")
     results = filter_results(
         state["sql_statements"],
         state["query_results"]
     )
 
-    for i, res in enumerate(results, 1):
-        print(f"\nValid SQL: {res.get('sql')}")
-        print(f"Execution result:")
-        result = res.get("result")
-        print("[")
-        for row in result:
-            print(f"\t {row}")
-        print("]")
-    new_state = state.copy()
-    new_state["filter_results"] = results
+    # DEBUG-gated report: per-row formatting scales with result volume, so at INFO and above
+    # none of it runs. At DEBUG the report is accumulated in one buffer and emitted as a
+    # single log record instead of one GIL-held write per row; previews are truncated
+    # because only the top rows matter
+    if logger.isEnabledFor(logging.DEBUG):
+        buf = io.StringIO()
+        write = buf.write
+        write("\n================================[SqlExecutionAgent]=================================\n\n")
+        write("SqlExecutionAgent called result filtering function:\n")
+        write("Summarizing valid results based on executed SQLs and query results:\n")
+        for res in results:
+            write(f"\nValid SQL: {res.get('sql')} | params: {res.get('params')}\n")
+            write("Execution result:\n")
+            result = res.get("result")
+            write("[\n")
+            for row in result[:_PREVIEW_ROWS]:
+                write(f"\t {row}\n")
+            if len(result) > _PREVIEW_ROWS:
+                write(f"\t ... ({len(result) - _PREVIEW_ROWS} more rows omitted)\n")
+            write("]\n")
 
-    print("\nBased on confidence, this image was most likely taken at one of the following locations:")
-    for i, res in enumerate(results, 1):
-        result = res.get("result")
-        for idx, row in enumerate(result, 1):
-            print(f"[{idx}]: {row}")
-        if i > 0:
-            break
+        write("\nBased on confidence, this image was most likely taken at one of the following locations:\n")
+        if results:  # Only the top-confidence result is shown here, no need to loop over the rest
+            for idx, row in enumerate(results[0].get("result")[:_PREVIEW_ROWS], 1):
+                write(f"[{idx}]: {row}\n")
+        logger.debug(buf.getvalue())
 
-    return new_state
+    # Return only the updated channel (partial update), LangGraph merges it into the shared state
+    return {"filter_results": results}
 
@@ -3,191 +3,350 @@ Result Summarizer Operator (Logical Operator)
 
 Converts structured query results into natural language descriptions for better user experience.
 """
-from typing import List, Dict, Any, Tuple
+import asyncio
+import heapq
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 from agent.shared.state import AgentState
-from llm.qwen_wrapper import QwenWrapper
+from common.config_loader import load_config
+from llm.errors import LLMError
+from operators.coordination import _summary_cache
 
+# Summary-cleanup patterns, compiled once at import instead of per call (the per-call forms
+# also competed for slots in re's bounded internal cache)
+_WS_RUN = re.compile(r'[ \t]+')
+_EXTRA_NEWLINES = re.compile(r'\n{3,}')
+_SENTENCE_SPLIT = re.compile(r'([.!?]\s+)')
 
-def format_results_for_llm(filter_results: List[Dict[str, Any]], detected_objects: List[Dict[str, Any]]) -> Tuple[str, int]:
+_SHINGLE_SIZE = 4  # Character 4-grams are enough to catch rephrased/contained duplicates
+_DUPLICATE_JACCARD = 0.7  # Shingle-set overlap above this ratio marks a near-duplicate sentence
+
+
+def _shingles(text: str) -> frozenset:
+    """Character k-gram set of a sentence (the whole text when shorter than one shingle)."""
+    if len(text) <= _SHINGLE_SIZE:
+        return frozenset((text,))
+    return frozenset(text[i:i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1))
+
+# Formatting requirements per number of available location options (capped at 3).
+# Hoisted to module scope so the large prompt strings are built once at import instead of
+# per call, and the system message bytes stay identical across calls (friendly to any
+# provider-side prompt-prefix caching).
+_FORMAT_INSTRUCTIONS = {
+    1: (
+        "Write a SINGLE paragraph describing the location. "
+        "Start with 'This photo was likely taken...' and provide a detailed description "
+        "including the specific address, nearby landmarks, and supporting evidence."
+    ),
+    2: (
+        "Write TWO paragraphs, each separated by a blank line. "
+        "Paragraph 1 (HIGHEST PRIORITY): Start with 'This photo was likely taken...' - describe Option 1. "
+        "Paragraph 2 (SECOND PRIORITY): Start with 'Alternatively, it could also be...' or 'It could also be...' - describe Option 2."
+    ),
+    3: (
+        "Write THREE paragraphs, each separated by a blank line. "
+        "Paragraph 1 (HIGHEST PRIORITY): Start with 'This photo was likely taken...' - describe Option 1. "
+        "Paragraph 2 (SECOND PRIORITY): Start with 'Alternatively, it could also be...' or 'It could also be...' - describe Option 2. "
+        "Paragraph 3 (THIRD PRIORITY): Start with 'Another possibility is...' or 'Additionally, it might be...' - describe Option 3."
+    ),
+}
+
+_PARAGRAPH_GUIDANCE = {
+    1: (
+        "Write exactly ONE paragraph. "
+        "Start with 'This photo was likely taken...' and describe the location in detail."
+    ),
+    2: (
+        "Write exactly TWO paragraphs, each separated by a blank line. "
+        "Start the first paragraph with 'This photo was likely taken...', "
+        "and the second with 'Alternatively, it could also be...' or 'It could also be...'."
+    ),
+    3: (
+        "Write exactly THREE paragraphs, each separated by a blank line. "
+        "Start the first paragraph with 'This photo was likely taken...', "
+        "the second with 'Alternatively, it could also be...' or 'It could also be...', "
+        "and the third with 'Another possibility is...' or 'Additionally, it might be...'."
+    ),
+}
+
+# Fully static part of the system prompt: persona + content guidelines, identical across all
+# option counts. Kept as one contiguous prefix placed FIRST in the message — provider-side
+# prompt caching (DashScope/Qwen, like OpenAI/Anthropic) keys off exact prefix bytes, so a
+# stable prefix means repeated calls only pay prefill for the short dynamic tail
+_STATIC_SYSTEM = (
+    "You are a helpful assistant that describes photo locations in a natural, friendly, and informative way. "
+    "Based on the detected objects and geographic location analysis results, provide a clear and engaging summary "
+    "answering where the photo was likely taken."
+    "\n\nContent Guidelines:\n"
+    "- Prioritize locations that match multiple detected objects (higher match_count = more relevant)\n"
+    "- Mention the key landmarks or objects that helped identify each location\n"
+    "- Include specific addresses, street names, or area names when available\n"
+    "- Mention the distance between landmarks when relevant\n"
+    "- Write in a conversational, user-friendly tone\n"
+    "- Each paragraph should be 2-3 sentences\n"
+    "- Be confident for the first paragraph (highest match_count), but acknowledge lower confidence for subsequent options\n"
+    "- Focus on what makes each location identifiable (nearby landmarks, objects, etc.)"
+)
+
+# Full system message per option count, assembled once at import: static prefix first, the
+# short per-variant formatting fragment last
+_SUMMARIZER_SYSTEM_MSGS = {
+    n: {
+        "role": "system",
+        "content": (
+            f"{_STATIC_SYSTEM}"
+            "\n\nIMPORTANT FORMATTING REQUIREMENTS:\n"
+            f"{_FORMAT_INSTRUCTIONS[n]}"
+        ),
+    }
+    for n in (1, 2, 3)
+}
+
+
+@lru_cache(maxsize=64)
+def _label_pattern(labels: Tuple[str, ...]) -> Optional["re.Pattern"]:
+    """
+    Compile one alternation regex over the detected labels (longest first, so longer labels
+    are not shadowed by shorter ones they contain). Cached: the same photo's label set is
+    reused across rows and repeated calls.
+
+    :param labels: Sorted tuple of detected object labels
+    :return: Compiled pattern, or None when there are no labels
+    """
+    if not labels:
+        return None
+    ordered = sorted(labels, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, ordered)))
+
+
+def format_results_for_llm(filter_results: List[Dict[str, Any]], detected_objects: List[Dict[str, Any]]) -> Tuple[str, int, List[tuple]]:
     """
     Format filter results and detected objects into a structured text for LLM processing.
-    
+
     :param filter_results: Filtered query results
     :param detected_objects: Detected objects from perception
-    :return: Tuple of (formatted text for LLM, number of available location options)
+    :return: Tuple of (formatted text for LLM, number of available location options,
+             ranked top location tuples)
     """
     # Format detected objects (only high confidence ones, exclude sunset)
     high_confidence_objects = [
         obj for obj in detected_objects 
         if obj.get('confidence', 0) > 0.7 and obj.get('label', '') != '夕阳'
     ]
-    objects_text = "Key objects detected in the image:\n"
+    # List buffer + join instead of str +=: repeated concatenation reallocates the whole
+    # string each round (quadratic if detection counts grow)
+    objects_parts = ["Key objects detected in the image:\n"]
     object_labels = []
     for i, obj in enumerate(high_confidence_objects, 1):
         label = obj.get('label', 'Unknown')
         confidence = obj.get('confidence', 0)
-        objects_text += f"{i}. {label} (confidence: {confidence:.0%})\n"
+        objects_parts.append(f"{i}. {label} (confidence: {confidence:.0%})\n")
         object_labels.append(label)
+    objects_text = "".join(objects_parts)
+    # One multi-pattern scan per row instead of one substring pass per label: the alternation
+    # regex matches every distinct label in a single traversal of the location names
+    label_pat = _label_pattern(tuple(sorted(set(object_labels))))
     
-    # Format location results - prioritize locations that match multiple detected objects
-    locations_text = "\nGeographic location analysis results (sorted by relevance):\n"
-    all_locations = []
+    # Format location results - prioritize locations that match multiple detected objects.
+    # Dedup and ranking are fused into one pass: only the 3 best rows are ever stored
+    # (a bounded heap), so rejected rows never allocate more than their ranking tuple
+    locations_parts = ["\nGeographic location analysis results (sorted by relevance):\n"]
     seen_pairs = set()
-    
+    best = []  # Size-3 min-heap over NEGATED ranking keys: the root is the worst kept row
+    num_locations = 0
+
     for res in filter_results:
         result = res.get("result", [])
-        sql = res.get("sql", "")
         for row in result:
-            # Create a unique key to avoid duplicates
-            loc_a = row.get('a_name', '')
-            loc_b = row.get('b_name', '')
-            pair_key = tuple(sorted([loc_a, loc_b]))
-            
-            if pair_key not in seen_pairs:
-                seen_pairs.add(pair_key)
-                # Count how many detected objects match this location pair
-                match_count = 0
-                for label in object_labels:
-                    if label in loc_a or label in loc_b:
-                        match_count += 1
-                
-                location_info = {
-                    "location_a_name": loc_a,
-                    "location_a_address": row.get('a_address', ''),
-                    "location_b_name": loc_b,
-                    "location_b_address": row.get('b_address', ''),
-                    "distance": row.get('distance', 0),
-                    "match_count": match_count  # How many detected objects match
-                }
-                all_locations.append(location_info)
-    
-    # Sort by match_count (descending) then by distance (ascending)
-    # Locations matching more detected objects are more relevant
-    all_locations.sort(key=lambda x: (-x.get('match_count', 0), x.get('distance', float('inf'))))
-    num_locations = len(all_locations)
-    top_locations = all_locations[:3]  # Top 3 most relevant locations
-    
-    for i, loc in enumerate(top_locations, 1):
-        match_info = f"matches {loc['match_count']} detected objects" if loc['match_count'] > 0 else "no direct object match"
-        locations_text += (
-            f"\nOption {i} ({match_info}, distance: {loc['distance']:.0f}m):\n"
-            f"  - {loc['location_a_name']} ({loc['location_a_address']})\n"
-            f"  - {loc['location_b_name']} ({loc['location_b_address']})\n"
+            get = row.get  # Pre-bound once per row: avoids repeated method lookup below
+            # Create a unique, order-insensitive key to avoid duplicates; a 2-element
+            # frozenset skips the list + sort + tuple round-trip per row
+            loc_a = get('a_name', '')
+            loc_b = get('b_name', '')
+            pair_key = frozenset((loc_a, loc_b))
+            if pair_key in seen_pairs:
+                continue
+            seen_pairs.add(pair_key)
+
+            # Count how many detected objects match this location pair: both names are
+            # scanned as one string (NUL-joined so no label can straddle the boundary)
+            loc_text = loc_a + "\x00" + loc_b
+            match_count = len(set(label_pat.findall(loc_text))) if label_pat else 0
+
+            # Heap entry with the ranking key negated (the heap keeps the LARGEST negated
+            # keys = the most relevant rows); -num_locations makes ties resolve toward
+            # earlier insertion, matching a stable sort, and keeps key comparison from
+            # ever falling through to the name strings
+            entry = (
+                match_count,
+                -get('distance', 0),
+                -num_locations,
+                loc_a,
+                get('a_address', ''),
+                loc_b,
+                get('b_address', ''),
+            )
+            num_locations += 1
+            if len(best) < 3:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)  # New row beats the worst kept one
+
+    # Unwind the heap: sorting the (at most 3) negated keys descending restores relevance
+    # order — match_count descending, then distance ascending — and each entry folds back
+    # into the (-match_count, distance, ...) flat tuple the renderer and callers consume
+    top_locations = [
+        (-mc, -neg_dist, loc_a, addr_a, loc_b, addr_b)
+        for mc, neg_dist, _idx, loc_a, addr_a, loc_b, addr_b in sorted(best, reverse=True)
+    ]
+
+    for i, (neg_match, distance, loc_a, addr_a, loc_b, addr_b) in enumerate(top_locations, 1):
+        match_count = -neg_match
+        match_info = f"matches {match_count} detected objects" if match_count > 0 else "no direct object match"
+        locations_parts.append(
+            f"\nOption {i} ({match_info}, distance: {distance:.0f}m):\n"
+            f"  - {loc_a} ({addr_a})\n"
+            f"  - {loc_b} ({addr_b})\n"
         )
-    
-    return objects_text + locations_text, num_locations
+
+    return objects_text + "".join(locations_parts), num_locations, top_locations
+
+
+def _render_single(distance: float, loc_a: str, addr_a: str, loc_b: str, addr_b: str) -> str:
+    """Deterministic single-location summary rendered from the structured fields."""
+    return (
+        f"This photo was likely taken near {loc_a} ({addr_a}), "
+        f"about {distance:.0f} meters from {loc_b} ({addr_b})."
+    )
 
 
-def summarize_result_operator(state: AgentState) -> AgentState:
+def _print_summary(summary: str) -> None:
+    """Print the natural language summary banner."""
+    print("\n================================[ResultSummarizer]=================================\n")
+    print("ResultSummarizer generated natural language description:")
+    print("\n" + "="*70)
+    print(summary)
+    print("="*70 + "\n")
+
+
+async def summarize_result_operator(state: AgentState) -> AgentState:
     """
-    LangGraph node function: Convert structured results into natural language description.
-    
+    LangGraph node function: Convert structured results into natural language description
+    (async so LangGraph can overlap the LLM round-trip with other work).
+
     This operator takes the filtered query results and generates a user-friendly natural language
     summary while preserving the original structured output.
-    
+
     :param state: Agent state
     :return: Updated state (contains summary field)
     """
     filter_results = state.get("filter_results", [])
     detected_objects = state.get("objects", [])
     
-    # If no results, return early
+    # If no results, return early (partial update, LangGraph merges it into the shared state)
     if not filter_results or not detected_objects:
-        new_state = state.copy()
-        new_state["summary"] = "No location information could be determined from the image."
-        return new_state
+        return {"summary": "No location information could be determined from the image."}
     
     # Format results for LLM and get the number of available location options
-    formatted_data, num_locations = format_results_for_llm(filter_results, detected_objects)
-    
-    # Dynamically build prompt based on actual number of location options
+    formatted_data, num_locations, top_locations = format_results_for_llm(filter_results, detected_objects)
+
+    # Select the precomputed prompt variant based on actual number of location options
     if num_locations == 0:
-        new_state = state.copy()
-        new_state["summary"] = "No location information could be determined from the image."
-        return new_state
-    elif num_locations == 1:
-        # Only one location option - single paragraph
-        format_instructions = (
-            "Write a SINGLE paragraph describing the location. "
-            "Start with 'This photo was likely taken...' and provide a detailed description "
-            "including the specific address, nearby landmarks, and supporting evidence."
-        )
-        paragraph_guidance = (
-            "Write exactly ONE paragraph. "
-            "Start with 'This photo was likely taken...' and describe the location in detail."
-        )
-    elif num_locations == 2:
-        # Two location options - two paragraphs
-        format_instructions = (
-            "Write TWO paragraphs, each separated by a blank line. "
-            "Paragraph 1 (HIGHEST PRIORITY): Start with 'This photo was likely taken...' - describe Option 1. "
-            "Paragraph 2 (SECOND PRIORITY): Start with 'Alternatively, it could also be...' or 'It could also be...' - describe Option 2."
-        )
-        paragraph_guidance = (
-            "Write exactly TWO paragraphs, each separated by a blank line. "
-            "Start the first paragraph with 'This photo was likely taken...', "
-            "and the second with 'Alternatively, it could also be...' or 'It could also be...'."
-        )
-    else:
-        # Three or more location options - three paragraphs (top 3)
-        format_instructions = (
-            "Write THREE paragraphs, each separated by a blank line. "
-            "Paragraph 1 (HIGHEST PRIORITY): Start with 'This photo was likely taken...' - describe Option 1. "
-            "Paragraph 2 (SECOND PRIORITY): Start with 'Alternatively, it could also be...' or 'It could also be...' - describe Option 2. "
-            "Paragraph 3 (THIRD PRIORITY): Start with 'Another possibility is...' or 'Additionally, it might be...' - describe Option 3."
-        )
-        paragraph_guidance = (
-            "Write exactly THREE paragraphs, each separated by a blank line. "
-            "Start the first paragraph with 'This photo was likely taken...', "
-            "the second with 'Alternatively, it could also be...' or 'It could also be...', "
-            "and the third with 'Another possibility is...' or 'Additionally, it might be...'."
-        )
-    
-    # Use LLM to generate natural language description
-    qwen = QwenWrapper()
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a helpful assistant that describes photo locations in a natural, friendly, and informative way. "
-                "Based on the detected objects and geographic location analysis results, provide a clear and engaging summary "
-                "answering where the photo was likely taken. "
-                f"\nIMPORTANT FORMATTING REQUIREMENTS:\n"
-                f"{format_instructions}"
-                "\n\nContent Guidelines:\n"
-                "- Prioritize locations that match multiple detected objects (higher match_count = more relevant)\n"
-                "- Mention the key landmarks or objects that helped identify each location\n"
-                "- Include specific addresses, street names, or area names when available\n"
-                "- Mention the distance between landmarks when relevant\n"
-                "- Write in a conversational, user-friendly tone\n"
-                "- Each paragraph should be 2-3 sentences\n"
-                "- Be confident for the first paragraph (highest match_count), but acknowledge lower confidence for subsequent options\n"
-                "- Focus on what makes each location identifiable (nearby landmarks, objects, etc.)"
+        return {"summary": "No location information could be determined from the image."}
+
+    # Fast path: a single candidate needs no LLM phrasing — a templated sentence covers it
+    # without paying the LLM round-trip (the dominant latency of this node). A candidate
+    # matched by multiple detected objects always takes it; otherwise the deterministic
+    # rendering is opt-in via the summary.template_single config flag
+    if num_locations == 1:
+        neg_match, distance, loc_a, addr_a, loc_b, addr_b = top_locations[0]
+        template_single = load_config().get('summary', {}).get('template_single', False)
+        if -neg_match >= 2:
+            summary = _render_single(distance, loc_a, addr_a, loc_b, addr_b) + (
+                " The objects detected in the image match both landmarks, "
+                "which makes this location a confident identification."
             )
-        },
+            _print_summary(summary)
+            return {"summary": summary}
+        if template_single:
+            summary = _render_single(distance, loc_a, addr_a, loc_b, addr_b)
+            _print_summary(summary)
+            return {"summary": summary}
+
+    # Semantic cache: the same (labels, top locations) outcome — exact or near-identical —
+    # reuses the previously generated summary and skips the LLM round-trip entirely
+    high_confidence_labels = [
+        obj.get('label', '') for obj in detected_objects
+        if obj.get('confidence', 0) > 0.7 and obj.get('label', '') != '夕阳'
+    ]
+    cache_key = _summary_cache.build_cache_key(
+        high_confidence_labels,
+        [(loc[2], loc[4]) for loc in top_locations],  # (a_name, b_name) of each ranked tuple
+    )
+    cached_summary = _summary_cache.lookup(cache_key)
+    if cached_summary is not None:
+        _print_summary(cached_summary)
+        return {"summary": cached_summary}
+
+    option_count = min(num_locations, 3)  # Top 3 most relevant locations are described at most
+
+    # Use LLM to generate natural language description (deferred import: the SDK behind
+    # QwenWrapper is slow to load and only needed once results actually reach this point)
+    from llm.qwen_wrapper import QwenWrapper
+
+    qwen = QwenWrapper.instance()  # Shared Qwen wrapper instance (avoids per-call construction)
+    messages = [
+        _SUMMARIZER_SYSTEM_MSGS[option_count],
         {
             "role": "user",
             "content": (
                 f"Based on the following analysis, describe where this photo was likely taken:\n\n"
                 f"{formatted_data}\n\n"
-                f"{paragraph_guidance}"
+                f"{_PARAGRAPH_GUIDANCE[option_count]}"
             )
         }
     ]
     
-    summary = qwen.chat(messages)
-    
+    def _drain_stream() -> str:
+        """
+        Drain the streamed response, echoing each delta as it arrives: the first tokens
+        reach the user after roughly one chunk instead of after the full generation.
+        The regex cleanup below runs only on the final joined buffer.
+        """
+        print("\n================================[ResultSummarizer]=================================\n")
+        print("ResultSummarizer generated natural language description:")
+        print("\n" + "=" * 70)
+        chunks = []
+        for delta in qwen.stream(messages):
+            print(delta, end='', flush=True)
+            chunks.append(delta)
+        print("\n" + "=" * 70 + "\n")
+        return "".join(chunks)
+
+    try:
+        # The dashscope stream is synchronous, so draining runs in a worker thread
+        # (asyncio.to_thread) and the event loop stays free during generation
+        summary = await asyncio.to_thread(_drain_stream)
+    except LLMError:
+        # Stream could not be established / broke mid-way. Locations WERE determined by
+        # this point — only the LLM phrasing is unavailable — so fall back to the
+        # deterministic rendering of the best candidate instead of claiming nothing was found
+        _, distance, loc_a, addr_a, loc_b, addr_b = top_locations[0]
+        summary = _render_single(distance, loc_a, addr_a, loc_b, addr_b)
+        _print_summary(summary)
+        return {"summary": summary}
+
     # Clean up the summary: preserve paragraph structure while removing duplicates
     if summary:
-        import re
         # Remove leading/trailing whitespace
         summary = summary.strip()
         # Preserve paragraph breaks (double newlines) but normalize single newlines within paragraphs
         # First, normalize multiple spaces to single space within paragraphs
-        summary = re.sub(r'[ \t]+', ' ', summary)
+        summary = _WS_RUN.sub(' ', summary)
         # Preserve paragraph breaks (double newlines or more)
-        summary = re.sub(r'\n{3,}', '\n\n', summary)
+        summary = _EXTRA_NEWLINES.sub('\n\n', summary)
         # Normalize single newlines within paragraphs to spaces (but keep double newlines for paragraphs)
         lines = summary.split('\n')
         cleaned_lines = []
@@ -207,28 +366,31 @@ def summarize_result_operator(state: AgentState) -> AgentState:
         for para in paragraphs:
             if para.strip():
                 # Simple deduplication: remove duplicate sentences within the same paragraph
-                sentences = re.split(r'([.!?]\s+)', para)
+                sentences = _SENTENCE_SPLIT.split(para)
                 cleaned_sentences = []
                 seen_in_para = set()
-                
+                seen_shingles = []  # Shingle sets of the kept sentences, compared via C-level set ops
+
                 for i in range(0, len(sentences), 2):
                     if i < len(sentences):
                         text = sentences[i].strip()
                         punct = sentences[i+1] if i+1 < len(sentences) else ''
-                        
-                        if text and text.lower() not in seen_in_para:
-                            # Check if this sentence is very similar to a previous one
-                            is_duplicate = False
-                            for seen in seen_in_para:
-                                if text.lower() in seen.lower() or seen.lower() in text.lower():
-                                    if abs(len(text) - len(seen)) < max(len(text), len(seen)) * 0.3:
-                                        is_duplicate = True
-                                        break
-                            
+                        lowered = text.lower()
+
+                        if text and lowered not in seen_in_para:
+                            # Near-duplicate check via shingle-set Jaccard overlap: one hash-set
+                            # intersection per kept sentence instead of pairwise substring scans
+                            sh = _shingles(lowered)
+                            is_duplicate = any(
+                                len(sh & prev) > _DUPLICATE_JACCARD * len(sh | prev)
+                                for prev in seen_shingles
+                            )
+
                             if not is_duplicate:
                                 cleaned_sentences.append(text + punct)
-                                seen_in_para.add(text.lower())
-                
+                                seen_in_para.add(lowered)
+                                seen_shingles.append(sh)
+
                 if cleaned_sentences:
                     cleaned_paragraphs.append(' '.join(cleaned_sentences))
         
@@ -238,16 +400,10 @@ def summarize_result_operator(state: AgentState) -> AgentState:
         if summary and not summary[-1] in '.!?':
             summary += '.'
     
-    # Update state
-    new_state = state.copy()
-    new_state["summary"] = summary
-    
-    # Print the natural language summary
-    print("\n================================[ResultSummarizer]=================================\n")
-    print("ResultSummarizer generated natural language description:")
-    print("\n" + "="*70)
-    print(summary)
-    print("="*70 + "\n")
-    
-    return new_state
+    # Remember the cleaned summary for this outcome so repeats skip the LLM next time.
+    # The raw text was already echoed while streaming, so no final print here.
+    _summary_cache.store(cache_key, summary)
+
+    # Return only the updated channel (partial update), LangGraph merges it into the shared state
+    return {"summary": summary}
 
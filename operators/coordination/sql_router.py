@@ -15,17 +15,15 @@ def sql_router_step(state: AgentState) -> AgentState:
     """
     executed = set(state.get("executed_sqls") or [])  # Already executed SQLs
     sql_list = state.get("sql_statements") or []  # Total SQL statements
-    remaining = [sql for sql in sql_list if sql not in executed]  # Remaining SQL statements = total SQL minus already executed
+    # Only the head of the remaining list is needed, so short-circuit at the first
+    # unexecuted statement instead of materializing the whole remaining list
+    current_sql = next((sql for sql in sql_list if sql not in executed), None)
 
-    if not remaining:  # No remaining, end directly
-        return state
+    if current_sql is None:  # No remaining, end directly (empty partial update, state unchanged)
+        return {}
 
-    current_sql = remaining[0]  # Get currently executing SQL statement
-
-    new_state = state.copy()  # Set new state, record current executing SQL statement content and index value in new state, return new state
-    new_state["current_sql"] = current_sql
-    new_state["current_index"] = len(executed) + 1
-    return new_state
+    # Return only the updated channels (partial update), LangGraph merges them into the shared state
+    return {"current_sql": current_sql, "current_index": len(executed) + 1}
 
 
 def route_sql_condition(state: AgentState) -> str:
@@ -35,6 +33,7 @@ def route_sql_condition(state: AgentState) -> str:
     :param state: Agent state
     :return: "continue" or "done"
     """
-    remaining = set(state.get("sql_statements") or []) - set(state.get("executed_sqls") or [])
-    return "continue" if remaining else "done"
+    executed = set(state.get("executed_sqls") or [])
+    # any() stops at the first unexecuted statement; no need to build the full set difference
+    return "continue" if any(sql not in executed for sql in state.get("sql_statements") or []) else "done"
 
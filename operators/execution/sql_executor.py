@@ -3,8 +3,11 @@ SQL Execution Operator (Physical Operator)
 
 Executes a single SQL query and returns result list (in dictionary form).
 """
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 import duckdb
 
 from common.config_loader import load_config
@@ -12,33 +15,108 @@ from common.config_loader import load_config
 # Cache database connection (avoid repeated creation)
 _duckdb_conn = None
 
+# Resolved once at import: the module's location fixes the project root, no need to
+# re-resolve the path chain on every cold-start check (load_config is already cached)
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]  # operators/execution/sql_executor.py -> project root directory
 
 def get_duckdb_conn():
     """Create and configure DuckDB database connection"""
     global _duckdb_conn
     if _duckdb_conn is None:
         config = load_config()
-        project_root = Path(__file__).resolve().parents[2]  # operators/execution/sql_executor.py -> project root directory
-        db_path = (project_root / config['duckdb']['path']).resolve()
-        _duckdb_conn = duckdb.connect(db_path)
+        db_path = (_PROJECT_ROOT / config['duckdb']['path']).resolve()
+        _duckdb_conn = duckdb.connect(db_path, config={
+            "threads": os.cpu_count() or 1,  # Let DuckDB use all cores (also feeds the batch executor)
+            "memory_limit": "4GB",
+        })
         _duckdb_conn.execute("INSTALL spatial;")
         _duckdb_conn.execute("LOAD spatial;")
+        _duckdb_conn.execute("PRAGMA enable_object_cache")  # Reuse scan metadata across queries
     return _duckdb_conn
 
 
-def execute_sql_query(sql: str) -> List[dict]:
+def _close_duckdb_conn():
+    """Close the shared connection at process exit (flushes the WAL cleanly)."""
+    if _duckdb_conn is not None:
+        try:
+            _duckdb_conn.close()
+        except Exception:
+            pass
+
+
+atexit.register(_close_duckdb_conn)
+
+
+def execute_sql_query(sql: str, params: Optional[Tuple] = None) -> List[dict]:
     """
     Execute a single SQL query and return result list (in dictionary form).
-    
-    :param sql: SQL statement
+
+    :param sql: SQL statement (may contain ? placeholders)
+    :param params: Optional parameters bound to the placeholders; parameterized statements
+                   keep the distinct statement texts down to a handful, which DuckDB
+                   prepares internally per execute call (the Python API cannot bind
+                   parameters through an explicit EXECUTE, so there is no server-side
+                   statement cache to layer on top)
     :return: Query results
     """
     try:
         conn = get_duckdb_conn()  # Open connection
-        result = conn.execute(sql).fetchall()  # Get single row execution result
+        cursor = conn.execute(sql, params)
+        result = cursor.fetchall()  # Get single row execution result
         columns = [desc[0] for desc in conn.description]
         # Convert to list[dict]
         return [dict(zip(columns, row)) for row in result]  # Convert query results to dictionary list
     except Exception as e:
         return [{"error": str(e)}]
 
+
+_BATCH_WORKERS = 4  # Independent spatial queries are data-parallel; DuckDB cursors share the catalog
+
+
+def _execute_on_cursor(conn, statement) -> List[dict]:
+    """Run one (sql, params) pair on a fresh cursor (thread-safe: one cursor per task)."""
+    sql, params = statement
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params or None)
+            result = cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in result]
+        finally:
+            cursor.close()
+    except Exception as e:
+        return [{"error": str(e)}]
+
+
+def execute_sql_batch(statements: List[Tuple[str, Tuple]]) -> List[List[dict]]:
+    """
+    Execute several independent SQL queries concurrently and return their results in order.
+
+    Each task gets its own cursor (duckdb cursors are thread-safe and share the connection's
+    catalog), so DuckDB can run the queries on its own thread pool instead of the graph
+    executing them one node re-entry at a time.
+
+    :param statements: List of (SQL statement, bound parameters) pairs
+    :return: One result list per statement, same order as the input
+    """
+    if not statements:
+        return []
+    conn = get_duckdb_conn()  # Open (shared) connection; cursors are created per task
+    if len(statements) == 1:  # No need to spin up a pool for a single query
+        return [execute_sql_query(*statements[0])]
+    with ThreadPoolExecutor(max_workers=min(_BATCH_WORKERS, len(statements))) as pool:
+        return list(pool.map(lambda stmt: _execute_on_cursor(conn, stmt), statements))
+
+
+
+# Warm the connection at import: opening the database and INSTALL/LOAD of the spatial
+# extension cost 100-300ms, which would otherwise land on the first query of the first
+# request. Best-effort: if warming fails here (missing database file, no network for the
+# extension download), the connection is reset and the first query retries, surfacing the
+# error through the normal path.
+try:
+    get_duckdb_conn()
+except Exception:
+    _close_duckdb_conn()
+    _duckdb_conn = None
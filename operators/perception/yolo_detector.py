@@ -3,9 +3,10 @@ YOLO Detection Operator (Physical Operator)
 
 Uses YOLOv8 model to detect objects in images, returns label, confidence, and bounding box for each object.
 """
+import os
 from pathlib import Path
 from typing import List
-from PIL import Image
+import torch
 from ultralytics import YOLO
 
 from agent.shared.state import ObjectBox
@@ -14,49 +15,102 @@ from common.config_loader import load_config
 # Cache model (load once, avoid repeated loading)
 _yolo_model = None
 
+# Resolved once at import: the module's location fixes the project root, no need to
+# re-resolve the path chain on every cold-start check (load_config is already cached)
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]  # operators/perception/yolo_detector.py -> project root directory
+
+# Inference arguments, decided once at model load: on GPU the forward pass runs in FP16
+# (half the weight/activation bytes, roughly double the throughput on modern cards);
+# on CPU the defaults stay FP32
+_predict_kwargs = {"verbose": False}
+
+_MAX_BATCH = 16  # Cap on images per forward pass, bounds peak activation memory
+
 
 def get_yolo_model() -> YOLO:
     """Call YOLO model"""
     global _yolo_model
     if _yolo_model is None:  # If YOLO model in cache is empty, get model configuration
         config = load_config()
-        project_root = Path(__file__).resolve().parents[2]  # operators/perception/yolo_detector.py -> project root directory
-        model_path = (project_root / config['yolo']['model_path']).resolve()
+        model_path = (_PROJECT_ROOT / config['yolo']['model_path']).resolve()
         if not model_path.exists():
             raise FileNotFoundError(f"YOLO model file not found: {model_path}")
         _yolo_model = YOLO(str(model_path))
+        try:
+            _yolo_model.fuse()  # Fold BatchNorm into Conv once at load, saves work every forward pass
+        except Exception:
+            pass  # Some exported formats cannot fuse; inference still works unfused
+        if torch.cuda.is_available():
+            _predict_kwargs.update(device=0, half=True)
+        else:
+            # CPU inference: let the intra-op thread pool use every core; torch does not
+            # tune this for the ultralytics path by default
+            torch.set_num_threads(os.cpu_count() or 1)
     return _yolo_model  # Get model from model path
 
 
-def detect_objects(image_path: str) -> List[ObjectBox]:
+def _extract(result) -> List[ObjectBox]:
     """
-    Use YOLOv8 model to detect objects in images, returns label, confidence, and bounding box for each object.
-    
-    :param image_path: Image file path
+    Extract the detected objects from one ultralytics result (one image).
+
+    :param result: Single ultralytics Results object
     :return: List of detected objects
     """
-    model = get_yolo_model()
-    # Load image
-    image = Image.open(image_path)
-    # Execute detection
-    results = model(image)  # Image detection results
-    boxes = results[0].boxes  # Bounding boxes
-    cls_names = results[0].names  # Class names
+    boxes = result.boxes  # Bounding boxes
+    cls_names = result.names  # Class names
+    # Pull all box tensors to the host in three bulk transfers instead of a per-box
+    # .tolist()/.item() device sync for every element
+    xyxy = boxes.xyxy.cpu().numpy()
+    confs = boxes.conf.cpu().numpy()
+    cls_ids = boxes.cls.cpu().numpy().astype(int)
     seen_labels = set()  # Already identified object class names
     detected_objects = []  # List of specific information for all detected objects
-    for i in range(len(boxes)):  # Loop through detection boxes for each object in the image
-        box = boxes[i]  # Extract detection box coordinates
-        x1, y1, x2, y2 = box.xyxy[0].tolist()
-        confidence = box.conf[0].item()  # Extract confidence
-        class_id = int(box.cls[0].item())  # Extract class ID
-        label = cls_names[class_id]  # Extract class name
+    for i in range(len(cls_ids)):  # Loop through detection boxes for each object in the image
+        label = cls_names[int(cls_ids[i])]  # Extract class name
         if label in seen_labels:  # If class label already exists, skip
             continue
         seen_labels.add(label)  # If class label doesn't exist, add to seen_labels set
         detected_objects.append({
             "label": label,  # Label name
-            "confidence": confidence,  # Confidence
-            "bbox": [x1, y1, x2, y2]  # Bounding box coordinates
+            "confidence": float(confs[i]),  # Confidence
+            "bbox": xyxy[i].tolist()  # Bounding box coordinates
         })
     return detected_objects  # Return list of specific information for all detected objects
 
+
+def detect_objects(image_path: str) -> List[ObjectBox]:
+    """
+    Use YOLOv8 model to detect objects in images, returns label, confidence, and bounding box for each object.
+
+    :param image_path: Image file path
+    :return: List of detected objects
+    """
+    model = get_yolo_model()
+    # Execute detection: the path goes straight to ultralytics, which decodes via its C-level
+    # cv2 path instead of us paying a PIL decode plus an extra RGB conversion/copy first;
+    # verbose=False drops the per-call console logging overhead. inference_mode disables
+    # autograd tracking (and its version-counter bookkeeping) for the whole forward pass
+    with torch.inference_mode():
+        results = model(image_path, **_predict_kwargs)  # Image detection results
+    return _extract(results[0])
+
+
+def detect_objects_batch(image_paths: List[str]) -> List[List[ObjectBox]]:
+    """
+    Detect objects in several images with one batched forward pass.
+
+    Batching amortizes the per-call overhead (preprocessing, device copies, NMS launch)
+    across the whole list instead of paying it once per image. Ultralytics defaults to
+    batch=1 even for list sources, so the batch size must be passed explicitly or the
+    images still run one forward pass each.
+
+    :param image_paths: Image file paths
+    :return: One detected-object list per image, same order as the input paths
+    """
+    model = get_yolo_model()
+    paths = list(image_paths)
+    with torch.inference_mode():  # No autograd graph for inference
+        # Batched detection: batch is capped so a long list cannot blow activation memory
+        results = model(paths, batch=min(len(paths), _MAX_BATCH), **_predict_kwargs)
+    return [_extract(result) for result in results]
+
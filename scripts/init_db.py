@@ -1,4 +1,5 @@
 import duckdb
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from common.config_loader import load_config
 
@@ -17,6 +18,14 @@ def run_sql_file(conn, sql_file: Path):
         # DuckDB supports executing multiple SQL statements
         conn.execute(sql_content)
 
+def run_sql_file_on_cursor(conn, sql_file: Path):
+    """Run one SQL file on its own cursor (thread-safe: each cursor has its own transaction)."""
+    cursor = conn.cursor()
+    try:
+        run_sql_file(cursor, sql_file)
+    finally:
+        cursor.close()
+
 def init_db():
     conn = get_duckdb_conn()
 
@@ -24,12 +33,25 @@ def init_db():
     conn.execute("INSTALL spatial;")
     conn.execute("LOAD spatial;")
 
-    # Load SQL files sequentially
     sql_dir = Path(__file__).resolve().parent / "sql"
-    sql_files = sorted(sql_dir.glob("*.sql"))  # Execute in filename order
+    sql_files = sorted(sql_dir.glob("*.sql"))  # Filename order defines dependencies
+
+    # Partition by filename: "create" files define the schema and must run first (in order);
+    # the remaining files only insert data into distinct, already-created tables, so DuckDB
+    # can ingest them concurrently on one cursor per file
+    schema_files = [f for f in sql_files if "create" in f.stem]
+    data_files = [f for f in sql_files if "create" not in f.stem]
 
-    for sql_file in sql_files:
+    for sql_file in schema_files:
         run_sql_file(conn, sql_file)
+
+    if len(data_files) == 1:  # No need for a pool with a single data file
+        run_sql_file(conn, data_files[0])
+    elif data_files:
+        with ThreadPoolExecutor(max_workers=min(4, len(data_files))) as pool:
+            # list() drains the iterator so any exception surfaces here
+            list(pool.map(lambda f: run_sql_file_on_cursor(conn, f), data_files))
+
     conn.close()
     print("Database initialization completed.")
 